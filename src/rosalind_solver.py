@@ -5,13 +5,22 @@ Purpose: GUI integrating my Rosalind solutions
 """
 
 import os
+from bisect import bisect_right
+from collections import deque
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from ttkbootstrap.dialogs import Messagebox
-from tkinter.filedialog import askdirectory, askopenfilename
+from tkinter.filedialog import askdirectory, askopenfilename, asksaveasfilename
 from PIL import ImageTk, Image
 import standard_funcs
 
+result_cache = standard_funcs.ResultCache()
+
+# loaded by FastasTab.browse_dirs
+fastx_files = []
+seq_info = ''
+input_sequences = {}
+
 
 # --------------------------------------------------
 class RosalindSolver(tb.Window):
@@ -25,9 +34,19 @@ class RosalindSolver(tb.Window):
         button_style = tb.Style()
         button_style.configure('.', font=('Calibri', 15, 'bold'))
 
+        # background jobs, results are delivered back on the Tk main loop
+        self.task_runner = standard_funcs.TaskRunner(self.after)
+        self.protocol('WM_DELETE_WINDOW', self.close)
+
         # notebook setup
         Notebook(self)
 
+    def close(self):
+        """ Cancel running jobs and close the window, Python exits once they reach their next progress check """
+
+        self.task_runner.shutdown()
+        self.destroy()
+
 
 class Notebook(tb.Notebook):
     def __init__(self, parent):
@@ -105,6 +124,64 @@ class Explanation(tb.Frame):
         self.expl_text.insert('1.0', expl_text)
         self.expl_text.config(state=DISABLED)
 
+class TaskStatus(tb.Frame):
+    """ Progress bar and cancel button for the background jobs of one tab """
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.runner = parent.winfo_toplevel().task_runner
+        self.keys = set()
+
+        self.progress = tb.Progressbar(self, bootstyle='success', mode='determinate', length=300)
+        self.progress.pack(side='left', padx=5)
+
+        self.label = tb.Label(self, text='', width=24)
+        self.label.pack(side='left', padx=5)
+
+        cancel_button = tb.Button(self, bootstyle='danger', text='Cancel', command=self.cancel, width=8)
+        cancel_button.pack(side='left', padx=5)
+
+    def run(self, key, func, *args, on_done, on_stop=None, **kwargs):
+        """ Run func in the background, ignoring the click if the same job is still running """
+
+        if not self.runner.submit(key, func, *args, on_done=lambda result: self._finish(key, on_done, result),
+                                  on_error=lambda err: self._fail(key, err, on_stop),
+                                  on_progress=self._update,
+                                  on_cancel=lambda: self._stop(key, 'Cancelled', on_stop), **kwargs):
+            return
+
+        self.keys.add(key)
+        self.progress.config(mode='indeterminate')
+        self.progress.start()
+        self.label.config(text=f'Running {key}...')
+
+    def cancel(self):
+        """ Cancel the running jobs of this tab """
+
+        self.runner.cancel(list(self.keys))
+
+    def _update(self, done, total):
+        if total:
+            self.progress.stop()
+            self.progress.config(mode='determinate', maximum=total, value=done)
+
+    def _stop(self, key, text, on_stop=None):
+        self.keys.discard(key)
+        if not self.keys:
+            self.progress.stop()
+            self.progress.config(mode='determinate', value=0)
+        self.label.config(text=text)
+        if on_stop:
+            on_stop()
+
+    def _finish(self, key, on_done, result):
+        self._stop(key, '')
+        on_done(result)
+
+    def _fail(self, key, err, on_stop=None):
+        self._stop(key, 'Failed', on_stop)
+        Messagebox.ok(str(err), 'Error')
+
 class BasicsTab(tb.Frame):
     """ Input output for basics tab """
 
@@ -136,11 +213,20 @@ class BasicsTab(tb.Frame):
         translate_button = tb.Button(self.buttons_frame, bootstyle="light", text="Translate", command=self.basic_translate)
         translate_button.grid(row=1, column=4, pady=15, padx=5, sticky='W')
 
+        windows_button = tb.Button(self.buttons_frame, bootstyle="light", text="GC windows", command=self.basic_windows)
+        windows_button.grid(row=1, column=5, pady=15, padx=5, sticky='W')
+
+        self.status = TaskStatus(self.buttons_frame)
+        self.status.grid(row=2, column=0, columnspan=6, padx=5, sticky='W')
+
         # Output field
         self.output = tb.ScrolledText(self, height=6, width=130)
         self.output.pack(fill='both', expand=True)
         self.output.config(state=DISABLED)
 
+        self.view = OutputView(self, self.output)
+        self.view.pack(anchor='w')
+
     # Button commands
     def basic_count(self):
         """ Count bases in entry on button press """
@@ -161,10 +247,7 @@ class BasicsTab(tb.Frame):
         for key in counts:
             out += f'{counts[key]: <{max_width}}'
 
-        self.output.config(state='normal')
-        self.output.delete('1.0', 'end')
-        self.output.insert('1.0', f'{out}')
-        self.output.config(state=DISABLED)
+        self.view.show(f'{out}')
 
     def basic_transcribe(self):
         """ Transcribe entry on button press """
@@ -173,22 +256,19 @@ class BasicsTab(tb.Frame):
         if standard_funcs.is_NA(self.entry.get('1.0', 'end-1c').rstrip('\n')):
             out = standard_funcs.transcribe(self.entry.get("1.0", "end-1c").rstrip('\n'))
 
-        self.output.config(state='normal')
-        self.output.delete('1.0', 'end')
-        self.output.insert('1.0', f'{out}')
-        self.output.config(state=DISABLED)
+        self.view.show(f'{out}')
 
     def basic_revc(self):
         """ Revc of entry on button press """
 
         out = 'Not a valid nucleic acid sequence'
         if standard_funcs.is_NA(self.entry.get('1.0', 'end-1c').rstrip('\n')):
-            out = standard_funcs.get_revc(self.entry.get("1.0", "end-1c").rstrip('\n'))
+            try:
+                out = standard_funcs.get_revc(self.entry.get("1.0", "end-1c").rstrip('\n'))
+            except ValueError as err:
+                out = str(err)
 
-        self.output.config(state='normal')
-        self.output.delete('1.0', 'end')
-        self.output.insert('1.0', f'{out}')
-        self.output.config(state=DISABLED)
+        self.view.show(f'{out}')
 
     def basic_gc(self):
         """ Compute GC of entry on button press """
@@ -197,10 +277,7 @@ class BasicsTab(tb.Frame):
         if standard_funcs.is_NA(self.entry.get('1.0', 'end-1c').rstrip('\n')):
             out = standard_funcs.get_gc(self.entry.get("1.0", "end-1c").rstrip('\n'))
 
-        self.output.config(state='normal')
-        self.output.delete('1.0', 'end')
-        self.output.insert('1.0', f'{out}')
-        self.output.config(state=DISABLED)
+        self.view.show(f'{out}')
 
     def basic_translate(self):
         """ Translate entry on button press """
@@ -209,10 +286,217 @@ class BasicsTab(tb.Frame):
         if standard_funcs.is_NA(self.entry.get('1.0', 'end-1c').rstrip('\n')):
             out = standard_funcs.translate(self.entry.get("1.0", "end-1c").rstrip('\n'))
 
-        self.output.config(state='normal')
-        self.output.delete('1.0', 'end')
-        self.output.insert('1.0', f'{out}')
-        self.output.config(state=DISABLED)
+        self.view.show(f'{out}')
+
+    def basic_windows(self):
+        """ Plot GC content and GC skew along the entry on button press """
+
+        sequence = self.entry.get('1.0', 'end-1c').rstrip('\n')
+
+        if not sequence or not standard_funcs.is_NA(sequence):
+            Messagebox.ok('Not a valid nucleic acid sequence', 'Invalid input')
+            return
+
+        window = max(len(sequence) // 100, 1)
+        self.status.run('windows', standard_funcs.window_profile, sequence, window, max(window // 2, 1),
+                        on_done=lambda profile: ProfilePlot(self, profile, window))
+
+class OutputView(tb.Frame):
+    """ Page controls for a Text widget, results are inserted chunk by chunk and large ones can be saved """
+
+    PAGE_SIZE = 200_000
+    CHUNK_SIZE = 20_000
+
+    def __init__(self, parent, text, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.text = text
+        self.parts = []
+        # offsets[i] is where parts[i] starts in the result, offsets[-1] is its length
+        self.offsets = [0]
+        self.page = 0
+        self._source = None
+        self._open = False
+        self._stream = 0
+        self._shown = 0
+        self._job = None
+
+        self.prev_button = tb.Button(self, bootstyle='light', text='<', width=3, state=DISABLED,
+                                     command=lambda: self.show_page(self.page - 1))
+        self.prev_button.grid(row=0, column=0, padx=2, pady=2)
+
+        self.page_label = tb.Label(self, text='', width=12, anchor='center')
+        self.page_label.grid(row=0, column=1, padx=2)
+
+        self.next_button = tb.Button(self, bootstyle='light', text='>', width=3, state=DISABLED,
+                                     command=lambda: self.show_page(self.page + 1))
+        self.next_button.grid(row=0, column=2, padx=2, pady=2)
+
+        self.save_button = tb.Button(self, bootstyle='light', text='Save full result', state=DISABLED,
+                                     command=self.save)
+        self.save_button.grid(row=1, column=0, columnspan=3, pady=2, sticky='w')
+
+    @property
+    def length(self):
+        return self.offsets[-1]
+
+    @property
+    def pages(self):
+        return max(1, -(-self.length // self.PAGE_SIZE))
+
+    def show(self, result):
+        """ Replace the output by result, a string or an iterable of strings read a chunk at a time """
+
+        self.begin()
+        self._source = iter([result] if isinstance(result, str) else result)
+        self._pull()
+
+    def begin(self):
+        """ Clear the output for a result arriving in parts, returns the stream number for extend and end """
+
+        self._cancel()
+        self.parts, self.offsets, self.page, self._shown = [], [0], 0, 0
+        self._source, self._open = None, True
+        self._stream += 1
+        self._clear()
+        self._update_controls()
+
+        return self._stream
+
+    def extend(self, parts, stream=None):
+        """ Add parts to the result, inserting them while they fit on the first page """
+
+        if stream not in (None, self._stream):
+            return
+
+        for part in parts:
+            self.parts.append(part)
+            self.offsets.append(self.offsets[-1] + len(part))
+
+        if self._shown < self.PAGE_SIZE:
+            new_text = self._slice(self._shown, min(self.length, self.PAGE_SIZE))
+            self._insert(new_text)
+            self._shown += len(new_text)
+
+    def end(self, stream=None):
+        """ Mark the result as complete, enabling paging and saving """
+
+        if stream not in (None, self._stream):
+            return
+
+        self._open = False
+        self._update_controls()
+
+    def _pull(self):
+        """ Read the next parts of the result """
+
+        self._job = None
+        new_parts = []
+        read = 0
+
+        for part in self._source:
+            new_parts.append(part)
+            read += len(part)
+            if read >= self.CHUNK_SIZE:
+                break
+        else:
+            self._source = None
+
+        self.extend(new_parts)
+
+        if self._source is not None:
+            self._job = self.after(1, self._pull)
+        else:
+            self.end()
+
+    def _slice(self, start, end):
+        """ Text between two offsets of the result, joined from the parts it spans """
+
+        index = bisect_right(self.offsets, start) - 1
+        pieces = []
+
+        while index < len(self.parts) and self.offsets[index] < end:
+            pieces.append(self.parts[index][max(start - self.offsets[index], 0):end - self.offsets[index]])
+            index += 1
+
+        return ''.join(pieces)
+
+    def show_page(self, page):
+        """ Show one page of a finished result, inserting it chunk by chunk """
+
+        if self._open or not 0 <= page < self.pages:
+            return
+
+        self._cancel()
+        self.page = page
+        self._clear()
+        self._update_controls()
+        self._insert_chunks(page * self.PAGE_SIZE, min((page + 1) * self.PAGE_SIZE, self.length))
+
+    def _insert_chunks(self, start, end):
+        self._job = None
+        self._insert(self._slice(start, min(start + self.CHUNK_SIZE, end)))
+        if start + self.CHUNK_SIZE < end:
+            self._job = self.after(1, self._insert_chunks, start + self.CHUNK_SIZE, end)
+
+    def save(self):
+        """ Write the whole result to a file """
+
+        path = asksaveasfilename(title='Save full result', defaultextension='.txt',
+                                 filetypes=(('Text files', '*.txt'), ('All files', '*.*')))
+        if path:
+            with open(path, 'w') as handle:
+                handle.writelines(self.parts)
+
+    def _update_controls(self):
+        many = self.pages > 1 and not self._open
+        self.page_label.config(text=f'Page {self.page + 1}/{self.pages}' if many else '')
+        self.prev_button.config(state='normal' if many and self.page > 0 else DISABLED)
+        self.next_button.config(state='normal' if many and self.page < self.pages - 1 else DISABLED)
+        self.save_button.config(state='normal' if many else DISABLED)
+
+    def _insert(self, text):
+        self.text.config(state='normal')
+        self.text.insert('end', text)
+        self.text.config(state=DISABLED)
+
+    def _clear(self):
+        self.text.config(state='normal')
+        self.text.delete('1.0', 'end')
+        self.text.config(state=DISABLED)
+
+    def _cancel(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+
+class ProfilePlot(tb.Toplevel):
+    """ Line plots of windowed GC content and GC skew """
+
+    def __init__(self, parent, profile, window, width=900, height=500):
+        super().__init__(title=f'GC content and skew, window {window} bp')
+        self.geometry(f'{width}x{height}')
+
+        canvas = tb.Canvas(self, width=width, height=height, background='white')
+        canvas.pack(fill='both', expand=True)
+
+        margin = 50
+        panel = (height - 3*margin) / 2
+        last = max(int(profile.starts[-1]), 1) if len(profile.starts) else 1
+        xs = [margin + (width - 2*margin) * int(x) / last for x in profile.starts]
+
+        panels = ((profile.gc, 0, 100, 'GC %', 'seagreen'), (profile.skew, -1, 1, 'GC skew', 'steelblue'))
+        for row, (values, low, high, label, colour) in enumerate(panels):
+            top = margin + row * (panel + margin)
+            canvas.create_rectangle(margin, top, width - margin, top + panel, outline='grey')
+            canvas.create_text(margin, top - 15, text=label, anchor='w')
+            canvas.create_text(margin - 5, top, text=str(high), anchor='e')
+            canvas.create_text(margin - 5, top + panel, text=str(low), anchor='e')
+            points = [coord for x, value in zip(xs, values.tolist())
+                      for coord in (x, top + panel * (high - value) / (high - low))]
+            if len(points) >= 4:
+                canvas.create_line(*points, fill=colour)
+
+        canvas.create_text(width - margin, height - margin + 20, text=f'position (bp, last window at {last})', anchor='e')
 
 class FibTab(tb.Frame):
     """ Input output for Fib tab """
@@ -275,15 +559,16 @@ class FibTab(tb.Frame):
 
         newline ="\n"
 
-        if not months:
-            self.results.config(text=f'Number of rabbits:{newline*2}'
-                               f'  gen {"": <2} rabbits {newline*2}' 
-                               f'{newline.join(f"  {i+1: <6} {standard_funcs.fib(i+1, int(litter)): <2}" for i in range(int(gen))[-10:])}')
-
+        # one pass over the generations, keeping only the last 10
         if months:
-            self.results.config(text=f'Number of rabbits:{newline*2}'
-                               f'  gen {"": <2} rabbits {newline*2}' 
-                               f'{newline.join(f"  {i+1: <6} {standard_funcs.fibd(i+1, int(months), int(litter))[0]: <2}" for i in range(int(gen))[-10:])}')
+            counts = (alive for alive, _ in standard_funcs.iter_fibd(int(gen), int(months), int(litter)))
+        else:
+            counts = standard_funcs.iter_fib(int(gen), int(litter))
+        last_gens = deque(enumerate(counts, start=1), maxlen=10)
+
+        self.results.config(text=f'Number of rabbits:{newline*2}'
+                           f'  gen {"": <2} rabbits {newline*2}' 
+                           f'{newline.join(f"  {i: <6} {count: <2}" for i, count in last_gens)}')
 
 class FastasTab(tb.Frame):
     """Input output for fastas tab"""
@@ -307,6 +592,9 @@ class FastasTab(tb.Frame):
         width=8)
         browse_btn.pack(side='right', padx=10)
 
+        self.status = TaskStatus(self, borderwidth=5, bootstyle='dark')
+        self.status.pack(anchor='n')
+
         # Output frame
         output_frame = tb.Frame(self, borderwidth=10, bootstyle='dark')
         output_frame.pack(fill='both', expand=True)
@@ -321,6 +609,18 @@ class FastasTab(tb.Frame):
         self.motif_input = tb.Entry(buttons_frame, width=19, font=('Calibri', 15))
         self.motif_input.pack(pady=2, padx=10, anchor='nw')
 
+        mismatch_frame = tb.Frame(buttons_frame)
+        mismatch_frame.pack(pady=2, padx=10, anchor='nw')
+        mismatch_label = tb.Label(mismatch_frame, text='Max mismatches:')
+        mismatch_label.pack(side='left')
+        self.mismatch_entry = tb.Entry(mismatch_frame, width=3)
+        self.mismatch_entry.pack(side='left', padx=5)
+        self.mismatch_entry.insert(0, '0')
+
+        self.both_strands_var = tb.BooleanVar(value=False)
+        both_strands_check = tb.Checkbutton(buttons_frame, text='Both strands', variable=self.both_strands_var)
+        both_strands_check.pack(pady=2, padx=10, anchor='nw')
+
         consensus_button = tb.Button(buttons_frame, bootstyle='light', width=15, text='Consensus', command=self.consensus_click)
         consensus_button.pack(pady=8, padx=10, anchor='nw')
 
@@ -335,43 +635,93 @@ class FastasTab(tb.Frame):
         self.output.place(y=0, relx=0.3, relheight=1, relwidth=0.7)
         self.output.configure(state='disabled')
 
+        self.view = OutputView(buttons_frame, self.output)
+        self.view.pack(pady=8, padx=10, anchor='nw')
+
+    def show(self, text):
+        """ Replace the output, text is a string or an iterable of strings """
+
+        self.view.show(text)
+
+    def stream(self, key, func, *args):
+        """ Run a job that emits its result in parts, the output is replaced once the first parts arrive """
+
+        streams = []
+
+        def output(parts):
+            if not streams:
+                streams.append(self.view.begin())
+            self.view.extend(parts, streams[0])
+
+        def end(*_):
+            if streams:
+                self.view.end(streams[0])
+
+        self.status.run(key, func, *args, on_output=output, on_done=end, on_stop=end)
+
     def motif_click(self):
         """ Find motif """
 
-        motif_positions = {}
+        motifs = self.motif_input.get().replace(',', ' ').split()
+        mismatches = self.mismatch_entry.get().strip() or '0'
+        both_strands = self.both_strands_var.get()
 
-        for id in input_sequences:
-            motif_positions[id] = standard_funcs.find_motifs(input_sequences[id], self.motif_input.get())
+        if not mismatches.isdigit():
+            Messagebox.ok('Not a valid number of mismatches. Enter a positive integer.', 'Invalid input')
+            return
 
-        self.output.config(state='normal')
-        self.output.delete('1.0', 'end')
-        self.output.insert('1.0', f'{seq_info}\n\n\n')
-        self.output.insert('end', f'Start indexes of motif "{self.motif_input.get()}":\n\n')
-        for id in motif_positions:
-            self.output.insert('end', f'{id}: {", ".join(str(x) for x in motif_positions[id])}\n')
-        self.output.config(state='disabled')
+        def find(sequences, info, progress, emit):
+            motif_positions = standard_funcs.find_multi_motifs(sequences, motifs, both_strands,
+                                                               int(mismatches), progress=progress)
+            emit(f'{info}\n\n\n')
+            for motif, strand in (next(iter(motif_positions.values()), {})):
+                emit(f'Start indexes of motif "{motif}" ({strand} strand):\n\n')
+                for id in motif_positions:
+                    emit(f'{id}: {", ".join(str(x) for x in motif_positions[id][(motif, strand)])}\n')
+                emit('\n')
+
+        self.stream('motif', find, dict(input_sequences), seq_info)
 
     def consensus_click(self):
         """ Find consensus sequence """
 
-        seqs_list = [input_sequences[id] for id in input_sequences]
-    
-        consensus = standard_funcs.find_consensus(seqs_list)
+        def consensus(files, sequences, info, progress):
+            profile = result_cache.cached('profile', files, standard_funcs.get_profile, sequences.values(),
+                                          progress=progress)
+            return (f'{info}\n\n\n'
+                    f'Consensus sequence:\n\n'
+                    f'{profile.consensus}\n\n'
+                    f'Profile matrix:\n\n'
+                    f'{standard_funcs.format_profile(profile)}')
 
-        self.output.config(state='normal')
-        self.output.delete('1.0', 'end')
-        self.output.insert('1.0', f'{seq_info}\n\n\n')
-        self.output.insert('end', f'Consensus sequence:\n\n')
-        self.output.insert('end', consensus)
-        self.output.config(state='disabled')
+        self.status.run('consensus', consensus, list(fastx_files), dict(input_sequences), seq_info,
+                        on_done=self.show)
 
     def substring_click(self):
         """ Find longest substring """
-        return
+
+        def substrings(files, sequences, info, progress):
+            shared = result_cache.cached('substrings', files, standard_funcs.shared_substrings,
+                                         sequences, top=5, params=(5,), progress=progress)
+            return (f'{info}\n\n\n'
+                    f'Longest common substring:\n\n'
+                    f'{shared[0].substring if shared else ""}\n\n'
+                    f'Longest shared substrings:\n\n'
+                    + ''.join(f'{len(sub.substring)}: {sub.substring}\n' for sub in shared))
+
+        self.status.run('substring', substrings, list(fastx_files), dict(input_sequences), seq_info,
+                        on_done=self.show)
 
     def superstring_click(self):
         """ Find superstring """
-        return
+
+        def superstring(files, reads, info, progress):
+            result = result_cache.cached('superstring', files, standard_funcs.get_superstring, reads,
+                                         progress=progress)
+            return f'{info}\n\n\nShortest superstring ({len(result)} bp):\n\n{result}'
+
+        self.status.run('superstring', superstring, list(fastx_files), list(input_sequences.values()), seq_info,
+                        on_done=self.show)
 
     def browse_dirs(self):
         """ Browse directory and get all fastas """
@@ -383,21 +733,18 @@ class FastasTab(tb.Frame):
         self.dir_entry.delete(0, 'end')
         self.dir_entry.insert(0, path)
 
-        global fastx_files
-        fastx_files = [os.path.join(path, file) for file in os.listdir(path) 
-                       if os.path.isfile(os.path.join(path, file)) 
-                       and standard_funcs.guess_format(f'{file}') in ['fasta', 'fastq']]
-
-        global seq_info
-        seq_info = standard_funcs.list_seqinfo(fastx_files)
+        files = [os.path.join(path, file) for file in os.listdir(path) 
+                 if os.path.isfile(os.path.join(path, file)) 
+                 and standard_funcs.guess_format(f'{file}') in ['fasta', 'fastq']]
 
-        self.output.config(state='normal')
-        self.output.delete('1.0', 'end')
-        self.output.insert('1.0', seq_info)
-        self.output.config(state='disabled')
+        def loaded(result):
+            global fastx_files
+            global seq_info
+            global input_sequences
+            fastx_files, (seq_info, input_sequences) = files, result
+            self.show(seq_info)
 
-        global input_sequences
-        input_sequences = standard_funcs.extract_seqs(fastx_files)
+        self.status.run('ingest', standard_funcs.ingest_files, files, cache=result_cache, on_done=loaded)
 
 class GraphTab(tb.Frame):
     """ Input output Graph tab """
@@ -439,6 +786,9 @@ class GraphTab(tb.Frame):
         save_checkbox = tb.Checkbutton(save_frame, variable=self.open_image_var)
         save_checkbox.pack(side='left', padx=5)
 
+        self.status = TaskStatus(input_frame)
+        self.status.pack(anchor='w', pady=20)
+
         # Output frame
         output_frame = tb.Frame(self, borderwidth=10, bootstyle='dark')
         output_frame.place(rely=0.1, relx=0.35, relheight=1, relwidth=0.65)
@@ -458,8 +808,6 @@ class GraphTab(tb.Frame):
             Messagebox.ok('Not a valid fastx file.', 'Invalid input')
             return
 
-        input_sequences = standard_funcs.extract_seqs([file_path])
-
         overlap = self.overlap_entry.get()
         overlap = overlap.rstrip()
 
@@ -469,26 +817,64 @@ class GraphTab(tb.Frame):
         else:
             overlap = int(overlap)
 
-        dot = standard_funcs.visualize_graphs(standard_funcs.list_overlaps(input_sequences, overlap))
+        open_image = self.open_image_var.get()
+        self.status.run('graph', self.draw_graph, file_path, overlap, open_image, on_done=self.show_graph)
+
+    def draw_graph(self, file_path, overlap, open_image, progress):
+        """ Build and render the overlap graph in the background, returns a PIL image or a text summary """
+
+        def build():
+            # fasta records are fetched through the index, which is built on first use
+            sequences = standard_funcs.extract_seqs([file_path], standard_funcs.indexed_ids(file_path),
+                                                    progress=progress)
+            return standard_funcs.build_overlap_graph(sequences, [overlap], progress=progress)
+
+        graph = result_cache.cached('overlap_graph', [file_path], build, params=(overlap,))
         overlap_graph = f'{os.path.join(os.path.dirname(file_path), "out")}'
-        dot.render(overlap_graph, view=self.open_image_var.get(), format='png')
+        progress(1, 3)
+
+        if not standard_funcs.should_render(graph, overlap):
+            standard_funcs.write_graph(standard_funcs.iter_edges(graph, overlap), f'{overlap_graph}.dot')
+            standard_funcs.write_graph(standard_funcs.iter_edges(graph, overlap), f'{overlap_graph}.tsv', 'tsv')
+            stats = standard_funcs.graph_stats(graph, overlap)
+            newline = '\n'
+            return (f'Graph too large to render, written to{newline}'
+                    f'{overlap_graph}.dot and {overlap_graph}.tsv{newline*2}'
+                    f'{newline.join(f"{key}: {value}" for key, value in stats.items())}')
+
+        dot = standard_funcs.visualize_graphs(standard_funcs.iter_edges(graph, overlap))
+        dot.render(overlap_graph, view=open_image, format='png')
+        progress(2, 3)
+
+        if open_image:
+            return None
 
         graph_image = Image.open(f'{overlap_graph}.png')
+        base_width = 680
+        wpercent = (base_width / float(graph_image.size[0]))
+        hsize = int((float(graph_image.size[1]) * float(wpercent)))
+        graph_image = graph_image.resize((base_width, hsize), Image.Resampling.LANCZOS)
+
+        os.remove(f'{overlap_graph}.png')
+        os.remove(f'{overlap_graph}')
+
+        return graph_image
 
-        if not self.open_image_var.get():
-            base_width = 680
-            wpercent = (base_width / float(graph_image.size[0]))
-            hsize = int((float(graph_image.size[1]) * float(wpercent)))
-            graph_image = graph_image.resize((base_width, hsize), Image.Resampling.LANCZOS)
+    def show_graph(self, result):
+        """ Show the rendered graph or the summary of a graph too large to render """
 
-            graph_image = ImageTk.PhotoImage(graph_image)
-            self.output_image.config(image=graph_image)
+        if result is None:
+            return
+
+        if isinstance(result, str):
+            self.output_image.config(image='', text=result)
+            self.output_image.image = None
+        else:
+            graph_image = ImageTk.PhotoImage(result)
+            self.output_image.config(image=graph_image, text='')
             self.output_image.image = graph_image
-            self.output_image.pack(side='top', fill='both', expand='true')
 
-        if not self.open_image_var.get():
-            os.remove(f'{overlap_graph}.png')
-            os.remove(f'{overlap_graph}')
+        self.output_image.pack(side='top', fill='both', expand='true')
 
 
 # --------------------------------------------------
@@ -2,4 +2,20 @@ from .fastx_handling import *
 from .maths_operations import *
 from .sequence_operations import *
 from .fasta_tab import *
-from .graph import *
\ No newline at end of file
+from .graph import *
+from .fasta_index import *
+from .result_cache import *
+from .packed_seq import *
+from .profile_matrix import *
+from .substrings import *
+from .assembly import *
+from .motif_search import *
+from .translation import *
+from .orf_finder import *
+from .kernels import *
+from .composition import *
+from .distances import *
+from .permutations import *
+from .protein_operations import *
+from .kmers import *
+from .task_runner import *
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Greedy shortest superstring assembly with a hashed overlap index
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from itertools import groupby
+
+_HASH_BASE = 257
+_HASH_MOD = (1 << 61) - 1
+
+
+# --------------------------------------------------
+def find_overlaps(reads: List[str], min_overlap: int,
+                  progress: Optional[Callable[[int, int], None]] = None) -> List[Tuple[int, int, int]]:
+    """ All (length, i, j) where a suffix of read i equals a prefix of read j """
+
+    max_len = max(len(read) for read in reads)
+    powers = [1]
+    for _ in range(max_len):
+        powers.append(powers[-1] * _HASH_BASE % _HASH_MOD)
+
+    # one table of rolling prefix hashes from min_overlap on, hits are confirmed by comparing the strings
+    prefixes: Dict[int, List[int]] = {}
+    for j, read in enumerate(reads):
+        current = 0
+        for length, char in enumerate(read[:-1], 1):
+            current = (current * _HASH_BASE + ord(char)) % _HASH_MOD
+            if length >= min_overlap:
+                prefixes.setdefault(current, []).append(j)
+
+    overlaps = []
+
+    for i, read in enumerate(reads):
+        read_len = len(read)
+        current = 0
+        for length in range(1, read_len):
+            current = (ord(read[read_len-length]) * powers[length-1] + current) % _HASH_MOD
+            if length < min_overlap:
+                continue
+            for j in prefixes.get(current, ()):
+                if j != i and length < len(reads[j]) and reads[j].startswith(read[read_len-length:]):
+                    overlaps.append((length, i, j))
+        if progress:
+            progress(i + 1, len(reads))
+
+    return overlaps
+
+
+# --------------------------------------------------
+def drop_contained(reads: List[str]) -> List[str]:
+    """ Reads that are not substrings of another read, in their original order """
+
+    if not reads:
+        return []
+
+    # seeds of kept reads are indexed every step bases, so one of the first step seeds of a contained read is indexed
+    seed = step = (min(len(read) for read in reads) + 1) // 2
+    index: Dict[str, List[Tuple[int, int]]] = {}
+    kept = []
+    longest_first = sorted(range(len(reads)), key=lambda i: -len(reads[i]))
+
+    # a read can only be contained in a strictly longer one, duplicates are removed beforehand
+    for _, group in groupby(longest_first, key=lambda i: len(reads[i])):
+        group = [i for i in group if not _is_contained(reads[i], reads, index, seed, step)]
+        for i in group:
+            for pos in range(0, len(reads[i]) - seed + 1, step):
+                index.setdefault(reads[i][pos:pos + seed], []).append((i, pos))
+        kept.extend(group)
+
+    return [reads[i] for i in sorted(kept)]
+
+
+# --------------------------------------------------
+def _is_contained(read: str, reads: List[str], index: Dict[str, List[Tuple[int, int]]], seed: int, step: int) -> bool:
+    """ Whether read occurs in one of the indexed reads """
+
+    for offset in range(step):
+        for other, pos in index.get(read[offset:offset + seed], ()):
+            start = pos - offset
+            if 0 <= start <= len(reads[other]) - len(read) and reads[other].startswith(read, start):
+                return True
+
+    return False
+
+
+# --------------------------------------------------
+def assemble(reads: List[str], min_overlap: Optional[int] = None,
+             progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+    """ Greedily chain reads along their longest overlaps into contigs, reads inside other reads are dropped first """
+
+    reads = drop_contained(list(dict.fromkeys(read for read in reads if read)))
+
+    if not reads:
+        return []
+
+    if min_overlap is None:
+        min_overlap = min(len(read) for read in reads) // 2 + 1
+    min_overlap = max(min_overlap, 1)
+
+    overlaps = find_overlaps(reads, min_overlap, progress)
+    overlaps.sort(key=lambda x: -x[0])
+
+    successor: Dict[int, Tuple[int, int]] = {}
+    has_predecessor = set()
+    chain_root = list(range(len(reads)))
+
+    def find_root(node: int) -> int:
+        while chain_root[node] != node:
+            chain_root[node] = chain_root[chain_root[node]]
+            node = chain_root[node]
+        return node
+
+    for length, i, j in overlaps:
+        if i in successor or j in has_predecessor or find_root(i) == find_root(j):
+            continue
+        successor[i] = (j, length)
+        has_predecessor.add(j)
+        chain_root[find_root(j)] = find_root(i)
+
+    contigs = []
+    for head in range(len(reads)):
+        if head in has_predecessor:
+            continue
+        parts = [reads[head]]
+        node = head
+        while node in successor:
+            node, length = successor[node]
+            parts.append(reads[node][length:])
+        contigs.append(''.join(parts))
+
+    return contigs
+
+
+# --------------------------------------------------
+def get_superstring(reads: List[str], min_overlap: Optional[int] = None,
+                    progress: Optional[Callable[[int, int], None]] = None) -> str:
+    """ Superstring of reads overlapping by more than half, contigs that never chain are joined without overlap """
+
+    return ''.join(assemble(reads, min_overlap, progress))
+
+
+# --------------------------------------------------
+def test_get_superstring() -> None:
+    """ Test get_superstring """
+
+    reads = ['ATTAGACCTG', 'CCTGCCGGAA', 'AGACCTGCCG', 'GCCGGAATAC']
+    steps = []
+
+    assert get_superstring(reads) == 'ATTAGACCTGCCGGAATAC'
+    assert get_superstring(reads[::-1], progress=lambda done, total: steps.append(done)) == 'ATTAGACCTGCCGGAATAC'
+    assert steps == [1, 2, 3, 4]
+    assert get_superstring(['ACGT', 'ACGT']) == 'ACGT'
+    assert get_superstring([]) == ''
+    assert sorted(assemble(['AAAC', 'GGGT'])) == ['AAAC', 'GGGT']
+    assert get_superstring(['ACGTT', 'GTTCA'], min_overlap=4) == 'ACGTTGTTCA'
+    assert get_superstring(['ACGTT', 'GTTCA'], min_overlap=3) == 'ACGTTCA'
+    assert get_superstring(['ACGTACGTAA', 'GTACG']) == 'ACGTACGTAA'
+    assert drop_contained(['CGT', 'ACGTA', 'GTACC', 'TTT', 'TACC']) == ['ACGTA', 'GTACC', 'TTT']
+    assert drop_contained(['GTACGTTT', 'A', 'CGTACG', 'TACG']) == ['GTACGTTT', 'CGTACG']
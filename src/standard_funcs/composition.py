@@ -0,0 +1,105 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Sliding-window GC content, GC skew and base composition
+"""
+
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+import numpy as np
+from .fastx_handling import iter_records
+
+BASES = 'ACGTN'
+
+# A, C, G, T case-insensitive, everything else counts as N
+_BASE_INDEX = np.full(256, 4, dtype=np.uint8)
+for _index, _base in enumerate('ACGT'):
+    _BASE_INDEX[ord(_base)] = _index
+    _BASE_INDEX[ord(_base.lower())] = _index
+
+
+# --------------------------------------------------
+class WindowProfile(NamedTuple):
+    """ Per window start position, GC percentage, GC skew and base counts of one sequence """
+
+    seq_id: str
+    starts: np.ndarray
+    gc: np.ndarray
+    skew: np.ndarray
+    counts: Dict[str, np.ndarray]
+
+
+# --------------------------------------------------
+def window_profile(sequence: str, window: int = 1000, step: Optional[int] = None, seq_id: str = '',
+                   block_size: int = 1 << 16, progress: Optional[Callable[[int, int], None]] = None) -> WindowProfile:
+    """ Composition of windows from cumulative base counts, computed block by block """
+
+    step = step or window
+    sequence = str(sequence)
+    window = min(window, len(sequence)) or 1
+    num_windows = (len(sequence) - window) // step + 1 if sequence else 0
+
+    starts = np.arange(num_windows, dtype=np.int64) * step
+    counts = np.zeros((len(BASES), num_windows), dtype=np.int64)
+    # one block spans about block_size bases plus one window, its cumulative counts are int32
+    block_windows = max(1, block_size // step)
+
+    for first in range(0, num_windows, block_windows):
+        block_starts = starts[first:first + block_windows]
+        offset = int(block_starts[0])
+        region = sequence[offset:int(block_starts[-1]) + window].encode('ascii', 'replace')
+        indexes = _BASE_INDEX[np.frombuffer(region, dtype=np.uint8)]
+
+        cumulative = np.zeros((len(BASES), len(indexes) + 1), dtype=np.int32)
+        for base in range(len(BASES)):
+            np.cumsum(indexes == base, out=cumulative[base, 1:])
+
+        local = block_starts - offset
+        counts[:, first:first + len(block_starts)] = cumulative[:, local + window] - cumulative[:, local]
+        if progress:
+            progress(first + len(block_starts), num_windows)
+
+    g_count, c_count = counts[2], counts[1]
+    gc_count = g_count + c_count
+    skew = np.divide(g_count - c_count, gc_count, out=np.zeros(num_windows), where=gc_count > 0)
+
+    return WindowProfile(seq_id, starts, 100 * gc_count / window, skew,
+                         {base: counts[i] for i, base in enumerate(BASES)})
+
+
+# --------------------------------------------------
+def iter_window_profiles(files: List[str], window: int = 1000, step: Optional[int] = None) -> Iterator[WindowProfile]:
+    """ Stream window profiles of all records of fastx files """
+
+    for rec in iter_records(files):
+        yield window_profile(rec.seq, window, step, rec.id)
+
+
+# --------------------------------------------------
+def test_window_profile() -> None:
+    """ Test window_profile """
+
+    profile = window_profile('GGGGCCCCAAnT', window=4, step=2, seq_id='s')
+
+    assert profile.seq_id == 's'
+    assert profile.starts.tolist() == [0, 2, 4, 6, 8]
+    assert profile.gc.tolist() == [100, 100, 100, 50, 0]
+    assert profile.skew.tolist() == [1, 0, -1, -1, 0]
+    assert profile.counts['N'].tolist() == [0, 0, 0, 0, 1]
+    assert window_profile('GGGGCCCCAAnT', 4, 2, block_size=3).gc.tolist() == profile.gc.tolist()
+
+    steps = []
+    window_profile('GGGGCCCCAAnT', 4, 2, block_size=4, progress=lambda done, total: steps.append((done, total)))
+    assert steps == [(2, 5), (4, 5), (5, 5)]
+    assert window_profile('GC', window=10).gc.tolist() == [100]
+    assert window_profile('').gc.tolist() == []
+
+
+# --------------------------------------------------
+def test_iter_window_profiles(tmp_path) -> None:
+    """ Test iter_window_profiles """
+
+    fasta = tmp_path / 'seqs.fa'
+    fasta.write_text('>a\nGGAA\n>b\nCCCC\n')
+
+    assert [(p.seq_id, p.gc.tolist()) for p in iter_window_profiles([str(fasta)], 2)] == [('a', [100, 0]),
+                                                                                         ('b', [100, 100])]
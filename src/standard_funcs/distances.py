@@ -0,0 +1,110 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: All-vs-all Hamming and p-distance matrices
+"""
+
+from typing import List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+# --------------------------------------------------
+def encode_matrix(seqs: List[str]) -> np.ndarray:
+    """ Sequences as rows of a uint8 matrix, shorter ones padded with 0 """
+
+    width = max((len(seq) for seq in seqs), default=0)
+    matrix = np.zeros((len(seqs), width), dtype=np.uint8)
+
+    for row, seq in enumerate(seqs):
+        raw = str(seq).encode('ascii')
+        matrix[row, :len(raw)] = np.frombuffer(raw, dtype=np.uint8)
+
+    return matrix
+
+
+# --------------------------------------------------
+def _tile_distances(rows: np.ndarray, cols: np.ndarray, max_cells: int = 1 << 24) -> np.ndarray:
+    """ Mismatch counts between two blocks of encoded sequences """
+
+    distances = np.zeros((len(rows), len(cols)), dtype=np.int64)
+    chunk = max(1, max_cells // max(1, len(rows) * len(cols)))
+
+    # padding only counts where one sequence is longer, as in get_hamming
+    for start in range(0, rows.shape[1], chunk):
+        distances += (rows[:, None, start:start+chunk] != cols[None, :, start:start+chunk]).sum(axis=2)
+
+    return distances
+
+
+# --------------------------------------------------
+def _tile_job(job: Tuple[int, int, np.ndarray, np.ndarray]) -> Tuple[int, int, np.ndarray]:
+    """ Process pool entry point for one tile """
+
+    row_start, col_start, rows, cols = job
+
+    return row_start, col_start, _tile_distances(rows, cols)
+
+
+# --------------------------------------------------
+def distance_matrix(seqs: List[str], p_distance: bool = False, workers: Optional[int] = None,
+                    tile: int = 256) -> np.ndarray:
+    """ Pairwise Hamming distances (or p-distances) of all sequences, tiled across processes """
+
+    matrix = encode_matrix(seqs)
+    num_seqs = len(seqs)
+    distances = np.zeros((num_seqs, num_seqs), dtype=np.int64)
+
+    jobs = [(i, j, matrix[i:i+tile], matrix[j:j+tile])
+            for i in range(0, num_seqs, tile) for j in range(i, num_seqs, tile)]
+
+    if len(jobs) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_tile_job, jobs))
+    else:
+        results = [_tile_job(job) for job in jobs]
+
+    for row_start, col_start, block in results:
+        distances[row_start:row_start+block.shape[0], col_start:col_start+block.shape[1]] = block
+        distances[col_start:col_start+block.shape[1], row_start:row_start+block.shape[0]] = block.T
+
+    if not p_distance:
+        return distances
+
+    lengths = np.array([len(seq) for seq in seqs], dtype=np.int64)
+    longest = np.maximum(lengths[:, None], lengths[None, :])
+
+    return np.divide(distances, longest, out=np.zeros(distances.shape), where=longest > 0)
+
+
+# --------------------------------------------------
+def save_distance_matrix(distances: np.ndarray, path: str) -> None:
+    """ Write matrix as .npy or as whitespace separated text """
+
+    if path.endswith('.npy'):
+        np.save(path, distances)
+    else:
+        np.savetxt(path, distances, fmt='%.5f' if distances.dtype.kind == 'f' else '%d')
+
+
+# --------------------------------------------------
+def test_distance_matrix(tmp_path) -> None:
+    """ Test distance_matrix """
+
+    seqs = ['TTTCCATTTA', 'GATTCATTTC', 'TTTCCATTTT', 'GTTCCATTTA']
+
+    assert distance_matrix(seqs, p_distance=True).round(5).tolist() == [[0.0, 0.4, 0.1, 0.1],
+                                                                        [0.4, 0.0, 0.4, 0.3],
+                                                                        [0.1, 0.4, 0.0, 0.2],
+                                                                        [0.1, 0.3, 0.2, 0.0]]
+    assert distance_matrix(['AACC', 'AA', 'A-A']).tolist() == [[0, 2, 3], [2, 0, 2], [3, 2, 0]]
+
+    expected = distance_matrix(seqs, workers=1)
+    assert (distance_matrix(seqs, tile=3, workers=1) == expected).all()
+    assert (distance_matrix(seqs, tile=1, workers=2) == expected).all()
+    assert distance_matrix([]).shape == (0, 0)
+
+    save_distance_matrix(distance_matrix(seqs, p_distance=True), str(tmp_path / 'pdst.txt'))
+    assert (tmp_path / 'pdst.txt').read_text().splitlines()[0] == '0.00000 0.40000 0.10000 0.10000'
+    save_distance_matrix(expected, str(tmp_path / 'dist.npy'))
+    assert (np.load(tmp_path / 'dist.npy') == expected).all()
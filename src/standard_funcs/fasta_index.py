@@ -0,0 +1,228 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Faidx-style index for random access into fasta files
+"""
+
+from typing import Dict, Iterator, NamedTuple, Optional
+import mmap
+import os
+
+
+# --------------------------------------------------
+class FaiEntry(NamedTuple):
+    """ One line of a .fai index """
+
+    name: str
+    length: int
+    offset: int
+    linebases: int
+    linewidth: int
+
+
+# --------------------------------------------------
+def index_path(fh: str) -> str:
+    """ Path of the sidecar index of a fasta file """
+
+    return f'{fh}.fai'
+
+
+# --------------------------------------------------
+def has_index(fh: str) -> bool:
+    """ Check if a fasta file has an index that is not older than the file """
+
+    fai = index_path(fh)
+
+    return os.path.isfile(fai) and os.path.getmtime(fai) >= os.path.getmtime(fh)
+
+
+# --------------------------------------------------
+def build_index(fh: str) -> str:
+    """ Scan a fasta file once and write its .fai index next to it """
+
+    entries = []
+    name, length, seq_offset, linebases, linewidth = None, 0, 0, 0, 0
+    short_line = False
+    offset = 0
+
+    with open(fh, 'rb') as handle:
+        for line in handle:
+            if line.startswith(b'>'):
+                if name is not None:
+                    entries.append(FaiEntry(name, length, seq_offset, linebases, linewidth))
+                title = line[1:].split(None, 1)
+                name = title[0].decode() if title else ''
+                length, seq_offset, linebases, linewidth = 0, offset + len(line), 0, 0
+                short_line = False
+            elif name is not None:
+                seq_line = line.rstrip(b'\r\n')
+                # the fasta parser drops spaces and trailing whitespace, which the offsets cannot express
+                if b' ' in seq_line or seq_line.rstrip() != seq_line:
+                    raise ValueError(f'Whitespace inside a sequence line of record "{name}" of "{fh}".')
+                bases = len(seq_line)
+                if (bases and short_line) or (linebases and bases > linebases):
+                    raise ValueError(f'Different line lengths in record "{name}" of "{fh}".')
+                if not linebases:
+                    linebases, linewidth = bases, len(line)
+                elif bases != linebases:
+                    short_line = True
+                length += bases
+            offset += len(line)
+
+    if name is not None:
+        entries.append(FaiEntry(name, length, seq_offset, linebases, linewidth))
+
+    with open(index_path(fh), 'wt') as fai:
+        for entry in entries:
+            fai.write('\t'.join(str(field) for field in entry) + '\n')
+
+    return index_path(fh)
+
+
+# --------------------------------------------------
+def read_index(fh: str) -> Dict[str, FaiEntry]:
+    """ Read the .fai index of a fasta file, raises ValueError if it does not describe the file """
+
+    index = {}
+    size = os.path.getsize(fh)
+
+    with open(index_path(fh), 'rt') as fai:
+        for line in fai:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) != 5:
+                raise ValueError(f'Malformed index line for "{fh}": {line!r}')
+            entry = FaiEntry(fields[0], *(int(x) for x in fields[1:]))
+            if not _fits(entry, size):
+                raise ValueError(f'Index entry "{entry.name}" does not fit "{fh}".')
+            index[entry.name] = entry
+
+    return index
+
+
+# --------------------------------------------------
+def _fits(entry: FaiEntry, size: int) -> bool:
+    """ Whether an index entry is consistent and its bases lie within a file of size bytes """
+
+    if min(entry[1:]) < 0 or entry.linebases > entry.linewidth or entry.offset > size:
+        return False
+
+    if not entry.length:
+        return True
+
+    last = entry.length - 1
+
+    return entry.linebases > 0 and \
+        entry.offset + (last // entry.linebases) * entry.linewidth + last % entry.linebases < size
+
+
+# --------------------------------------------------
+def load_index(fh: str) -> Optional[Dict[str, FaiEntry]]:
+    """ The index of a fasta file if it is up to date and readable, None if it is missing, stale or malformed """
+
+    if not has_index(fh):
+        return None
+
+    try:
+        return read_index(fh)
+    except (OSError, UnicodeDecodeError, ValueError):
+        return None
+
+
+# --------------------------------------------------
+class IndexedFasta:
+    """ Random access to records and subranges of an indexed fasta file """
+
+    def __init__(self, fh: str):
+        self.index = load_index(fh)
+        if self.index is None:
+            build_index(fh)
+            self.index = read_index(fh)
+        self._handle = open(fh, 'rb')
+        self._mm = None
+        if os.path.getsize(fh):
+            self._mm = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def close(self) -> None:
+        """ Release the memory map and file handle """
+
+        if self._mm is not None:
+            self._mm.close()
+        self._handle.close()
+
+    def _byte_pos(self, entry: FaiEntry, pos: int) -> int:
+        """ Byte offset of a sequence position """
+
+        return entry.offset + (pos // entry.linebases) * entry.linewidth + pos % entry.linebases
+
+    def fetch(self, name: str, start: int = 0, end: Optional[int] = None) -> str:
+        """ Fetch the 0-based, half-open range [start, end) of a record """
+
+        entry = self.index[name]
+        end = entry.length if end is None else min(end, entry.length)
+        start = max(start, 0)
+
+        if start >= end:
+            return ''
+
+        raw = self._mm[self._byte_pos(entry, start):self._byte_pos(entry, end-1)+1]
+
+        return raw.replace(b'\n', b'').replace(b'\r', b'').decode()
+
+
+# --------------------------------------------------
+def test_indexed_fasta(tmp_path) -> None:
+    """ Test build_index and IndexedFasta """
+
+    fasta = tmp_path / 'seqs.fa'
+    fasta.write_text('>seq1 first\nACGTA\nCGTAC\nGG\n>seq2\nTTTT\n>empty\n')
+
+    build_index(str(fasta))
+    assert read_index(str(fasta)) == {'seq1': ('seq1', 12, 12, 5, 6),
+                                      'seq2': ('seq2', 4, 33, 4, 5),
+                                      'empty': ('empty', 0, 45, 0, 0)}
+
+    with IndexedFasta(str(fasta)) as indexed:
+        assert list(indexed) == ['seq1', 'seq2', 'empty']
+        assert indexed.fetch('seq1') == 'ACGTACGTACGG'
+        assert indexed.fetch('seq1', 3, 7) == 'TACG'
+        assert indexed.fetch('seq1', 10) == 'GG'
+        assert indexed.fetch('seq2', 1, 100) == 'TTT'
+        assert indexed.fetch('empty') == ''
+
+    # only the last line of a record may differ, and only by being shorter, and lines hold no spaces
+    for text in ('>s\nACGTA\nCGTACGG\n', '>s\nACGTA\nCG\nTACGG\n', '>s\nAC GT\n', '>s\nACGT \n'):
+        fasta.write_text(text)
+        try:
+            build_index(str(fasta))
+            assert False
+        except ValueError:
+            pass
+
+
+# --------------------------------------------------
+def test_load_index(tmp_path) -> None:
+    """ Test load_index with malformed and foreign indexes """
+
+    fasta = tmp_path / 'seqs.fa'
+    fasta.write_text('>a\nACGT\n')
+    fai = tmp_path / 'seqs.fa.fai'
+
+    for text in ('a\t4\n', 'a\tfour\t3\t4\t5\n', 'a\t4000\t3\t4\t5\n', 'a\t4\t3\t5\t4\n', '\xff\n'):
+        fai.write_bytes(text.encode('latin-1'))
+        assert load_index(str(fasta)) is None
+        with IndexedFasta(str(fasta)) as indexed:
+            assert indexed.fetch('a') == 'ACGT'
+
+    assert load_index(str(fasta)) == {'a': ('a', 4, 3, 4, 5)}
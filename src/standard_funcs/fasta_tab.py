@@ -4,21 +4,15 @@ Date   : 2024-06-01
 Purpose: Functions for the fasta tab
 """
 
-from typing import List, Dict
-import pandas as pd
+from typing import Iterable, Dict
+from .profile_matrix import get_profile
 
 
 # --------------------------------------------------
-def find_consensus(seqs_list: List[str]) -> str:
+def find_consensus(seqs_list: Iterable[str]) -> str:
     """ Find the consensus sequecnce """
 
-    seqs_df = pd.DataFrame([list(seq) for seq in seqs_list])
-
-    profile_matrix = seqs_df.apply(lambda x: x.value_counts()).fillna(0).astype(int)
-
-    consensus = profile_matrix.apply(lambda x: x.idxmax()).to_string(header=False, index=False).split('\n')
-
-    return ''.join(consensus)
+    return get_profile(seqs_list).consensus
 
 
 # --------------------------------------------------
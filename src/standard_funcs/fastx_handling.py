@@ -4,11 +4,23 @@ Date   : 2024-05-27
 Purpose: Functions for handling fastx files
 """
 
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 import os
-import statistics
 from tabulate import tabulate
-from Bio import SeqIO
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+from Bio.SeqIO.QualityIO import FastqGeneralIterator
+from .fasta_index import IndexedFasta, build_index, has_index, load_index
+from .result_cache import ResultCache
+
+
+# --------------------------------------------------
+class FastxRecord(NamedTuple):
+    """ Single record of a fastx file """
+
+    id: str
+    seq: str
+    qual: Optional[str] = None
 
 
 # --------------------------------------------------
@@ -29,17 +41,92 @@ def guess_format(filename: str) -> str:
 
 
 # --------------------------------------------------
-def extract_seqs(files: List[str]) -> Dict[str, str]:
-    """ Extract sequences from list of fastx files """
+def iter_records(files: List[str]) -> Iterator[FastxRecord]:
+    """ Lazily yield records from fastx files one at a time """
+
+    for fh in files:
+        fmt = guess_format(fh)
+
+        if not fmt:
+            raise ValueError(f'Unknown fastx format for file "{fh}".')
+
+        with open(fh, 'rt') as handle:
+            if fmt == 'fasta':
+                for title, seq in SimpleFastaParser(handle):
+                    yield FastxRecord(_record_id(title), seq)
+            else:
+                for title, seq, qual in FastqGeneralIterator(handle):
+                    yield FastxRecord(_record_id(title), seq, qual)
+
+
+# --------------------------------------------------
+def _record_id(title: str) -> str:
+    """ Record id is the first word of the title line """
+
+    return title.split(None, 1)[0] if title.strip() else ''
+
+
+# --------------------------------------------------
+def _iter_seqs(fh: str, ids: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str]]:
+    """ Yield (id, sequence) of one file, fetching only the requested ids through the fasta index """
+
+    if ids is None:
+        for rec in iter_records([fh]):
+            yield rec.id, rec.seq
+    elif guess_format(fh) == 'fasta':
+        with IndexedFasta(fh) as indexed:
+            for name in ids:
+                if name in indexed.index:
+                    yield name, indexed.fetch(name)
+    else:
+        wanted = set(ids)
+        for rec in iter_records([fh]):
+            if rec.id in wanted:
+                yield rec.id, rec.seq
+
+
+# --------------------------------------------------
+def extract_seqs(files: List[str], ids: Optional[Iterable[str]] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, str]:
+    """ Extract sequences from list of fastx files, all of them or only the given ids """
 
     sequences = {}
+    ids = None if ids is None else list(ids)
+
     for fh in files:
-        if seqs:= [rec for rec in SeqIO.parse(fh, guess_format(fh))]:
-            sequences.update({seq.id: str(seq.seq) for seq in seqs})
+        for seq_id, seq in _iter_seqs(fh, ids):
+            sequences[seq_id] = seq
+            if progress:
+                progress(len(sequences), 0)
 
     return sequences
 
 
+# --------------------------------------------------
+def refresh_index(fh: str) -> bool:
+    """ Build or rebuild the index of a fasta file if it is missing or stale, False if it cannot be indexed """
+
+    if guess_format(fh) != 'fasta':
+        return False
+
+    if load_index(fh) is None:
+        try:
+            build_index(fh)
+        except (OSError, ValueError):
+            return False
+
+    return True
+
+
+# --------------------------------------------------
+def indexed_ids(fh: str) -> Optional[List[str]]:
+    """ Record ids of a fasta file read from its index, which is built if needed, None if it cannot be indexed """
+
+    index = load_index(fh) if refresh_index(fh) else None
+
+    return None if index is None else list(index)
+
+
 # --------------------------------------------------
 def write_to_fasta(seq_list: Dict[str, str], fname: str, out_dir: str = 'temp') -> None:
     """ Write sequences to fasta files """
@@ -53,21 +140,218 @@ def write_to_fasta(seq_list: Dict[str, str], fname: str, out_dir: str = 'temp')
 
 
 # --------------------------------------------------
-def list_seqinfo(files: List[str], tablefmt='simple'):
+def _summarize(name: str, lengths: Iterable[int]) -> Tuple[str, int, float, int, int]:
+    """ Count, mean, min and max of sequence lengths in one pass """
 
-    seqs_info = []
+    num_seqs, total_len = 0, 0
+    min_len, max_len = None, 0
 
-    for fh in files:
-        name = os.path.basename(fh)
-        if seqs:= [rec for rec in SeqIO.parse(fh, guess_format(fh))]:
-            min_len = min([len(str(seq.seq)) for seq in seqs])
-            max_len = max([len(str(seq.seq)) for seq in seqs])
-            avg_len = statistics.fmean([len(str(seq.seq)) for seq in seqs])
-            num_seqs = len(seqs)
-            seqs_info.append((name, num_seqs, avg_len, min_len, max_len))
-        else:
-            seqs_info.append((name, 0, 0, 0.00, 0))
+    for seq_len in lengths:
+        num_seqs += 1
+        total_len += seq_len
+        max_len = max(max_len, seq_len)
+        min_len = seq_len if min_len is None else min(min_len, seq_len)
+
+    if not num_seqs:
+        return (name, 0, 0, 0.00, 0)
+
+    return (name, num_seqs, total_len/num_seqs, min_len, max_len)
+
+
+# --------------------------------------------------
+def get_seqinfo(fh: str) -> Tuple[str, int, float, int, int]:
+    """ Sequence statistics of one fastx file, computed record by record """
+
+    index = load_index(fh) if guess_format(fh) == 'fasta' else None
+
+    if index is not None:
+        lengths = (entry.length for entry in index.values())
+    else:
+        lengths = (len(rec.seq) for rec in iter_records([fh]))
+
+    return _summarize(os.path.basename(fh), lengths)
+
+
+# --------------------------------------------------
+def list_seqinfo(files: List[str], tablefmt='simple', cache: Optional[ResultCache] = None):
+    """ Tabulate sequence statistics of fastx files """
+
+    if cache is not None:
+        seqs_info = [cache.cached('seqinfo', [fh], get_seqinfo, fh) for fh in files]
+    else:
+        seqs_info = [get_seqinfo(fh) for fh in files]
+
+    return _tabulate_seqinfo(seqs_info, tablefmt)
+
+
+# --------------------------------------------------
+def _tabulate_seqinfo(seqs_info: List[Tuple], tablefmt='simple') -> str:
+    """ Format per file statistics as table """
 
     headers = ['name', 'num_seqs', 'avg_len', 'min_len', 'max_len']
     
     return tabulate(seqs_info, headers=headers, tablefmt=tablefmt, floatfmt='.2f')
+
+
+# --------------------------------------------------
+def _ingest_file(fh: str, ids: Optional[List[str]] = None,
+                 progress: Optional[Callable[[int], None]] = None) -> Tuple[Tuple[str, int, float, int, int], Dict[str, str]]:
+    """ Read one file once, returning its statistics and sequences, known ids are fetched through the index """
+
+    indexed = refresh_index(fh)
+    sequences = {}
+    lengths = []
+
+    for seq_id, seq in _iter_seqs(fh, ids if indexed else None):
+        sequences[seq_id] = seq
+        lengths.append(len(seq))
+        if progress:
+            progress(len(lengths))
+
+    return _summarize(os.path.basename(fh), lengths), sequences
+
+
+# --------------------------------------------------
+def ingest_files(files: List[str], tablefmt='simple', workers: Optional[int] = None,
+                 cache: Optional[ResultCache] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> Tuple[str, Dict[str, str]]:
+    """ Read all files in one pass each, in parallel, returning statistics table and sequences """
+
+    results = {}
+    known_ids = {}
+
+    # only statistics and ids are cached, sequences are read again (through the index if there is one)
+    if cache is not None:
+        for fh in files:
+            hit, value = cache.get('ingest', [fh])
+            if hit:
+                known_ids[fh] = value[1]
+
+    ids = [known_ids.get(fh) for fh in files]
+
+    # progress counts records, the total is known when every file already has an index
+    indexes = [load_index(fh) for fh in files]
+    total = sum(len(index) for index in indexes) if all(index is not None for index in indexes) else 0
+    done = 0
+
+    if len(files) > 1 and workers != 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        slots = workers or os.cpu_count() or 1
+        queued = list(zip(files, ids))
+        running = {}
+        try:
+            # submit one file per free worker, so a cancelled progress call stops before the next file
+            while queued or running:
+                while queued and len(running) < slots:
+                    if progress:
+                        progress(done, total)
+                    fh, file_ids = queued.pop(0)
+                    running[executor.submit(_ingest_file, fh, file_ids)] = fh
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    fh = running.pop(future)
+                    results[fh] = future.result()
+                    done += len(results[fh][1])
+                    if progress:
+                        progress(done, total)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        for fh, file_ids in zip(files, ids):
+            results[fh] = _ingest_file(fh, file_ids,
+                                       (lambda records: progress(done + records, total)) if progress else None)
+            done += len(results[fh][1])
+
+    if cache is not None:
+        for fh in files:
+            if fh not in known_ids:
+                cache.put('ingest', [fh], (results[fh][0], list(results[fh][1])))
+
+    sequences = {}
+    for fh in files:
+        sequences.update(results[fh][1])
+
+    return _tabulate_seqinfo([results[fh][0] for fh in files], tablefmt), sequences
+
+
+# --------------------------------------------------
+def test_iter_records(tmp_path) -> None:
+    """ Test iter_records """
+
+    fasta = tmp_path / 'seqs.fa'
+    fasta.write_text('>seq1 first\nACGT\nAC\n>seq2\nGG\n')
+    fastq = tmp_path / 'reads.fq'
+    fastq.write_text('@read1\nACGT\n+\nIIII\n')
+
+    assert list(iter_records([str(fasta)])) == [('seq1', 'ACGTAC', None), ('seq2', 'GG', None)]
+    assert list(iter_records([str(fastq)])) == [('read1', 'ACGT', 'IIII')]
+    assert extract_seqs([str(fasta), str(fastq)]) == {'seq1': 'ACGTAC', 'seq2': 'GG', 'read1': 'ACGT'}
+    assert get_seqinfo(str(fasta)) == ('seqs.fa', 2, 4.0, 2, 6)
+
+    build_index(str(fasta))
+    assert extract_seqs([str(fasta)]) == {'seq1': 'ACGTAC', 'seq2': 'GG'}
+    assert get_seqinfo(str(fasta)) == ('seqs.fa', 2, 4.0, 2, 6)
+    assert extract_seqs([str(fasta), str(fastq)], ids=['seq2', 'read1', 'missing']) == {'seq2': 'GG', 'read1': 'ACGT'}
+    assert indexed_ids(str(fasta)) == ['seq1', 'seq2']
+    assert indexed_ids(str(fastq)) is None
+
+    # a truncated or foreign index is ignored and rebuilt
+    (tmp_path / 'seqs.fa.fai').write_text('a\t4\n')
+    assert get_seqinfo(str(fasta)) == ('seqs.fa', 2, 4.0, 2, 6)
+    assert ingest_files([str(fasta)])[1] == {'seq1': 'ACGTAC', 'seq2': 'GG'}
+    assert indexed_ids(str(fasta)) == ['seq1', 'seq2']
+
+
+# --------------------------------------------------
+def test_refresh_index(tmp_path) -> None:
+    """ Test refresh_index """
+
+    fasta = tmp_path / 'seqs.fa'
+    fasta.write_text('>seq1\nACGT\n')
+    irregular = tmp_path / 'irregular.fa'
+    irregular.write_text('>seq1\nAC\nACGT\n')
+
+    assert refresh_index(str(fasta)) and has_index(str(fasta))
+    assert not refresh_index(str(irregular))
+    assert not refresh_index(str(tmp_path / 'reads.fq'))
+
+    (tmp_path / 'seqs.fa.fai').unlink()
+    ingest_files([str(fasta)])
+    assert has_index(str(fasta))
+
+
+# --------------------------------------------------
+def test_ingest_files(tmp_path) -> None:
+    """ Test ingest_files """
+
+    files = []
+    for i in range(3):
+        fasta = tmp_path / f'{i}.fa'
+        fasta.write_text(f'>seq{i}\n{"A"*(i+1)}\n')
+        files.append(str(fasta))
+
+    for workers in (1, 2):
+        steps = []
+        seq_info, sequences = ingest_files(files, workers=workers, progress=lambda done, total: steps.append(done))
+        assert seq_info == list_seqinfo(files)
+        assert sequences == extract_seqs(files)
+        assert steps[-1] == 3 and steps == sorted(steps)
+
+    # a progress callback that raises stops the load, as a cancelled GUI job does
+    def cancel(done, total):
+        raise KeyboardInterrupt
+
+    for workers in (1, 2):
+        try:
+            ingest_files(files, workers=workers, progress=cancel)
+            assert False
+        except KeyboardInterrupt:
+            pass
+
+    assert ingest_files([]) == (list_seqinfo([]), {})
+
+    cache = ResultCache(str(tmp_path / 'cache'))
+    assert ingest_files(files, cache=cache) == ingest_files(files)
+    assert cache.get('ingest', [files[0]]) == (True, (_ingest_file(files[0])[0], ['seq0']))
+    assert ingest_files(files, cache=cache) == ingest_files(files)
+    assert list_seqinfo(files, cache=cache) == list_seqinfo(files)
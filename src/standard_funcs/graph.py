@@ -4,37 +4,197 @@ Date   : 2024-06-03
 Purpose: Creating overlap graph with Graphviz
 """
 
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Iterable, Iterator, NamedTuple, Callable, Optional
+from xml.sax.saxutils import quoteattr
+import numpy as np
 from Bio import SeqIO
 from graphviz import Digraph
 
+GRAPH_FORMATS = ('dot', 'tsv', 'graphml')
+MAX_RENDER_EDGES = 500
+PROGRESS_STEP = 4096
+
+
+# --------------------------------------------------
+class OverlapGraph(NamedTuple):
+    """ Node ids and, per overlap length, an (n, 2) array of source and target node indexes """
+
+    nodes: List[str]
+    edges: Dict[int, np.ndarray]
+
+
+# --------------------------------------------------
+def build_overlap_graph(sequences: Dict[str, str], overlaps: Iterable[int],
+                        progress: Optional[Callable[[int, int], None]] = None) -> OverlapGraph:
+    """ Build overlap graphs for several overlap lengths from a prefix index """
+
+    nodes = list(sequences)
+    seqs = list(sequences.values())
+    lengths = sorted(set(overlaps))
+
+    prefixes = {k: {} for k in lengths}
+    for node, seq in enumerate(seqs):
+        if progress and node % PROGRESS_STEP == 0:
+            progress(node, 2 * len(seqs))
+        for k in lengths:
+            prefixes[k].setdefault(seq[0:k], []).append(node)
+
+    edge_lists = {k: [] for k in lengths}
+    for node, seq in enumerate(seqs):
+        if progress and node % PROGRESS_STEP == 0:
+            progress(len(seqs) + node, 2 * len(seqs))
+        for k in lengths:
+            edge_lists[k].extend((node, target) for target in prefixes[k].get(seq[-k:], ())
+                                 if target != node)
+
+    edges = {k: np.array(edge_lists[k], dtype=np.int32).reshape(-1, 2) for k in lengths}
+
+    return OverlapGraph(nodes, edges)
+
 
 # --------------------------------------------------
 def list_overlaps(sequences: Dict[str, str], overlap) -> List[Tuple[str, str]]:
     """ List overlapping sequences """
 
-    seqs = [(id, sequences[id][0:overlap], sequences[id][-overlap:])
-            for id in sequences]
+    graph = build_overlap_graph(sequences, [overlap])
 
-    graphs = list(tuple())
+    return [(graph.nodes[source], graph.nodes[target]) for source, target in graph.edges[overlap].tolist()]
 
-    for i in range(len(seqs)):
-        for j in range(len(seqs)):
-            if i!= j and seqs[i][2] == seqs[j][1]:
-                graphs.append((seqs[i][0], seqs[j][0]))
 
-    return graphs
+# --------------------------------------------------
+def iter_edges(graph: OverlapGraph, overlap: int) -> Iterator[Tuple[str, str]]:
+    """ Yield the edges of one overlap length as id pairs """
+
+    for source, target in graph.edges[overlap].tolist():
+        yield graph.nodes[source], graph.nodes[target]
 
 
 # --------------------------------------------------
-def visualize_graphs(graphs: List[Tuple[str, str]]):
+def visualize_graphs(graphs: Iterable[Tuple[str, str]]):
     """ Visualize graph structure from overlaps """
 
     graphed = Digraph()
+    seen = set()
 
     for seq1, seq2 in graphs:
-        graphed.node(seq1)
-        graphed.node(seq2)
+        for node in (seq1, seq2):
+            if node not in seen:
+                graphed.node(node)
+                seen.add(node)
         graphed.edge(seq1, seq2)
 
     return graphed
+
+
+# --------------------------------------------------
+def _dot_id(node: str) -> str:
+    """ Quote a node id for DOT """
+
+    return '"' + node.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+# --------------------------------------------------
+def write_graph(edges: Iterable[Tuple[str, str]], path: str, fmt: str = 'dot') -> Tuple[int, int]:
+    """ Stream edges to a DOT, TSV or GraphML file, returns number of nodes and edges """
+
+    if fmt not in GRAPH_FORMATS:
+        raise ValueError(f'Unknown graph format "{fmt}", use one of {", ".join(GRAPH_FORMATS)}.')
+
+    seen = set()
+    num_edges = 0
+
+    with open(path, 'wt') as out:
+        if fmt == 'dot':
+            out.write('digraph {\n')
+        elif fmt == 'tsv':
+            out.write('source\ttarget\n')
+        else:
+            out.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                      '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                      '  <graph edgedefault="directed">\n')
+
+        for source, target in edges:
+            num_edges += 1
+            new_nodes = [node for node in dict.fromkeys((source, target)) if node not in seen]
+            seen.update(new_nodes)
+
+            if fmt == 'dot':
+                out.write(''.join(f'\t{_dot_id(node)}\n' for node in new_nodes))
+                out.write(f'\t{_dot_id(source)} -> {_dot_id(target)}\n')
+            elif fmt == 'tsv':
+                out.write(f'{source}\t{target}\n')
+            else:
+                out.write(''.join(f'    <node id={quoteattr(node)}/>\n' for node in new_nodes))
+                out.write(f'    <edge source={quoteattr(source)} target={quoteattr(target)}/>\n')
+
+        if fmt == 'dot':
+            out.write('}\n')
+        elif fmt == 'graphml':
+            out.write('  </graph>\n</graphml>\n')
+
+    return len(seen), num_edges
+
+
+# --------------------------------------------------
+def graph_stats(graph: OverlapGraph, overlap: int) -> Dict[str, int]:
+    """ Summary statistics of one overlap graph """
+
+    edges = graph.edges[overlap]
+    out_degree = np.bincount(edges[:, 0], minlength=len(graph.nodes))
+    in_degree = np.bincount(edges[:, 1], minlength=len(graph.nodes))
+
+    return {'sequences': len(graph.nodes),
+            'connected': int(np.count_nonzero(out_degree + in_degree)),
+            'edges': len(edges),
+            'max_out_degree': int(out_degree.max(initial=0)),
+            'max_in_degree': int(in_degree.max(initial=0))}
+
+
+# --------------------------------------------------
+def should_render(graph: OverlapGraph, overlap: int, max_edges: int = MAX_RENDER_EDGES) -> bool:
+    """ Only small graphs are rendered as images """
+
+    return len(graph.edges[overlap]) <= max_edges
+
+
+# --------------------------------------------------
+def test_list_overlaps() -> None:
+    """ Test list_overlaps and build_overlap_graph """
+
+    sequences = {'Rosalind_0498': 'AAATAAA', 'Rosalind_2391': 'AAATTTT', 'Rosalind_2323': 'TTTTCCC',
+                 'Rosalind_0442': 'AAATCCC', 'Rosalind_5013': 'GGGTGGG'}
+
+    assert list_overlaps(sequences, 3) == [('Rosalind_0498', 'Rosalind_2391'),
+                                           ('Rosalind_0498', 'Rosalind_0442'),
+                                           ('Rosalind_2391', 'Rosalind_2323')]
+    assert list_overlaps({}, 3) == []
+
+    graph = build_overlap_graph(sequences, [3, 4, 3])
+    assert graph.nodes == list(sequences)
+    assert graph.edges[3].tolist() == [[0, 1], [0, 3], [1, 2]]
+    assert graph.edges[4].tolist() == [[1, 2]]
+
+    steps = []
+    build_overlap_graph(sequences, [3], progress=lambda done, total: steps.append((done, total)))
+    assert steps == [(0, 10), (5, 10)]
+
+
+# --------------------------------------------------
+def test_write_graph(tmp_path) -> None:
+    """ Test write_graph and graph_stats """
+
+    edges = [('a', 'b'), ('a', 'c'), ('b', 'c')]
+
+    assert write_graph(iter(edges), str(tmp_path / 'g.dot')) == (3, 3)
+    assert (tmp_path / 'g.dot').read_text() == ('digraph {\n\t"a"\n\t"b"\n\t"a" -> "b"\n'
+                                                 '\t"c"\n\t"a" -> "c"\n\t"b" -> "c"\n}\n')
+    assert write_graph(edges, str(tmp_path / 'g.tsv'), 'tsv') == (3, 3)
+    assert (tmp_path / 'g.tsv').read_text() == 'source\ttarget\na\tb\na\tc\nb\tc\n'
+    assert write_graph(edges, str(tmp_path / 'g.graphml'), 'graphml') == (3, 3)
+    assert (tmp_path / 'g.graphml').read_text().count('<node ') == 3
+
+    graph = build_overlap_graph({'x': 'AAAT', 'y': 'ATTT', 'z': 'CCCC'}, [2])
+    assert graph_stats(graph, 2) == {'sequences': 3, 'connected': 2, 'edges': 1,
+                                     'max_out_degree': 1, 'max_in_degree': 1}
+    assert should_render(graph, 2)
+    assert not should_render(graph, 2, max_edges=0)
@@ -0,0 +1,79 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Bytes-level kernels for basic nucleic acid operations
+"""
+
+from typing import Union
+import numpy as np
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+DNA_BASES = b'ACGTacgt'
+RNA_BASES = b'ACGUacgu'
+NA_BASES = b'ACGTUacgtu'
+
+_TRANSCRIBE = bytes.maketrans(b'Tt', b'Uu')
+_COMPLEMENT = bytes.maketrans(DNA_BASES, b'TGCAtgca')
+
+
+# --------------------------------------------------
+def has_only(data: BytesLike, alphabet: bytes) -> bool:
+    """ Check that data contains only bytes from alphabet """
+
+    return not bytes(data).translate(None, alphabet)
+
+
+# --------------------------------------------------
+def transcribe_bytes(data: BytesLike) -> bytes:
+    """ Replace T by U, keeping case """
+
+    return bytes(data).translate(_TRANSCRIBE)
+
+
+# --------------------------------------------------
+def revc_bytes(data: BytesLike) -> bytes:
+    """ Reverse complement of a DNA sequence, raises ValueError on other symbols """
+
+    data = bytes(data)
+
+    if invalid := data.translate(None, DNA_BASES):
+        raise ValueError(f'Found "{chr(invalid[-1])}" in sequence. Please enter a valid DNA sequence.')
+
+    return data.translate(_COMPLEMENT)[::-1]
+
+
+# --------------------------------------------------
+def count_bytes(data: BytesLike) -> np.ndarray:
+    """ Occurrences of every byte value """
+
+    return np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+
+
+# --------------------------------------------------
+def gc_count_bytes(data: BytesLike) -> int:
+    """ Number of G and C, upper or lower case """
+
+    counts = count_bytes(data)
+
+    return int(sum(counts[base] for base in b'GCgc'))
+
+
+# --------------------------------------------------
+def test_kernels() -> None:
+    """ Test bytes kernels """
+
+    assert has_only(b'ACGTacgt', DNA_BASES)
+    assert not has_only(memoryview(b'ACGU'), DNA_BASES)
+    assert has_only(b'', DNA_BASES)
+    assert transcribe_bytes(bytearray(b'ATtG')) == b'AUuG'
+    assert revc_bytes(b'atTgC') == b'GcAat'
+    assert revc_bytes(memoryview(b'')) == b''
+    assert count_bytes(b'AAC')[ord('A')] == 2
+    assert gc_count_bytes(memoryview(b'GgCcAT')) == 4
+
+    try:
+        revc_bytes(b'ACNUT')
+        assert False
+    except ValueError as err:
+        assert '"U"' in str(err)
@@ -0,0 +1,201 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Streaming 2-bit k-mer codes, k-mer counts and k-mer composition
+"""
+
+from typing import Counter as CounterType, Dict, Iterator, List, Union
+from collections import Counter
+import numpy as np
+from .fastx_handling import iter_records
+
+MAX_K = 32
+MAX_HISTOGRAM_K = 12
+
+# A, C, G, T (U) as 0-3 case-insensitive, 4 for everything else
+_BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _bases in enumerate(('A', 'C', 'G', 'TU')):
+    for _base in _bases:
+        _BASE_CODES[ord(_base)] = _code
+        _BASE_CODES[ord(_base.lower())] = _code
+
+_ONE = np.uint64(1)
+_SIXTY_THREE = np.uint64(63)
+
+
+# --------------------------------------------------
+def kmer_code(kmer: str) -> int:
+    """ Integer code of a k-mer, lexicographic in ACGT order """
+
+    code = 0
+    for base in kmer:
+        code = (code << 2) | int(_BASE_CODES[ord(base)])
+
+    return code
+
+
+# --------------------------------------------------
+def decode_kmer(code: int, k: int) -> str:
+    """ k-mer of an integer code """
+
+    return ''.join('ACGT'[(code >> 2*(k - 1 - i)) & 3] for i in range(k))
+
+
+# --------------------------------------------------
+def _window_codes(bases: np.ndarray, k: int) -> np.ndarray:
+    """ Codes of all k-mers, cut from the 2-bit packed bases with one shift and mask each """
+
+    num_kmers = len(bases) - k + 1
+    quads = np.zeros(-(-len(bases) // 4) * 4, dtype=np.uint8)
+    quads[:len(bases)] = bases
+    quads = quads.reshape(-1, 4)
+
+    # 16 zero bytes of padding so every k-mer can read two big-endian words
+    packed = np.zeros(len(quads) + 16, dtype=np.uint8)
+    packed[:len(quads)] = (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+    words = np.ndarray(shape=(len(packed) - 7,), dtype='>u8', buffer=packed, strides=(1,))
+
+    positions = np.arange(num_kmers, dtype=np.int64)
+    first = positions >> 2
+    shift = ((positions & 3) << 1).astype(np.uint64)
+    window = (words[first].astype(np.uint64) << shift) | \
+             ((words[first + 8].astype(np.uint64) >> _ONE) >> (_SIXTY_THREE - shift))
+
+    return window >> np.uint64(64 - 2*k)
+
+
+# --------------------------------------------------
+def _block_codes(block: np.ndarray, k: int, canonical: bool) -> np.ndarray:
+    """ Codes of all k-mers of a block of base codes, dropping k-mers with other symbols """
+
+    num_kmers = len(block) - k + 1
+    invalid = block == 4
+    bases = np.where(invalid, 0, block).astype(np.uint8)
+    codes = _window_codes(bases, k)
+
+    # the reverse complement k-mer at i starts at num_kmers - 1 - i on the reverse complement
+    if canonical:
+        codes = np.minimum(codes, _window_codes(3 - bases[::-1], k)[::-1])
+
+    invalid_count = np.concatenate(([0], np.cumsum(invalid)))
+
+    return codes[invalid_count[k:] == invalid_count[:num_kmers]]
+
+
+# --------------------------------------------------
+def iter_kmer_codes(sequence: str, k: int, canonical: bool = False, block_size: int = 1 << 22) -> Iterator[np.ndarray]:
+    """ Stream uint64 k-mer codes block by block, canonical codes are the minimum of k-mer and reverse complement """
+
+    if not 0 < k <= MAX_K:
+        raise ValueError(f'k needs to be between 1 and {MAX_K}.')
+
+    bases = _BASE_CODES[np.frombuffer(str(sequence).encode('ascii', 'replace'), dtype=np.uint8)]
+
+    for start in range(0, len(bases) - k + 1, block_size):
+        yield _block_codes(bases[start:start + block_size + k - 1], k, canonical)
+
+
+# --------------------------------------------------
+def kmer_codes(sequence: str, k: int, canonical: bool = False) -> np.ndarray:
+    """ All k-mer codes of a sequence in order """
+
+    return np.concatenate([np.zeros(0, dtype=np.uint64), *iter_kmer_codes(sequence, k, canonical)])
+
+
+# --------------------------------------------------
+def count_kmers(sequence: str, k: int, canonical: bool = False) -> Union[np.ndarray, CounterType[int]]:
+    """ k-mer counts, a uint32 histogram indexed by code for k up to 12 (64 MB at k=12), a Counter of codes above """
+
+    if k <= MAX_HISTOGRAM_K:
+        histogram = np.zeros(4**k, dtype=np.uint32)
+        for codes in iter_kmer_codes(sequence, k, canonical):
+            # a full bincount per block only pays off while the histogram is smaller than the block
+            if 4**k <= len(codes):
+                histogram += np.bincount(codes.astype(np.int64), minlength=4**k).astype(np.uint32)
+            else:
+                values, occurrences = np.unique(codes, return_counts=True)
+                histogram[values.astype(np.int64)] += occurrences.astype(np.uint32)
+        return histogram
+
+    counts = Counter()
+    for codes in iter_kmer_codes(sequence, k, canonical):
+        values, occurrences = np.unique(codes, return_counts=True)
+        counts.update(dict(zip(values.tolist(), occurrences.tolist())))
+
+    return counts
+
+
+# --------------------------------------------------
+def kmer_composition(files: List[str], k: int = 4,
+                     canonical: bool = False) -> Dict[str, Union[np.ndarray, CounterType[int]]]:
+    """ k-mer composition of every record, vectors in lexicographic k-mer order up to k=12, sparse Counters above """
+
+    return {rec.id: count_kmers(rec.seq, k, canonical) for rec in iter_records(files)}
+
+
+# --------------------------------------------------
+def test_kmer_codes() -> None:
+    """ Test kmer_codes, kmer_code and decode_kmer """
+
+    assert kmer_codes('ACGTA', 2).tolist() == [1, 6, 11, 12]
+    assert [decode_kmer(code, 3) for code in kmer_codes('acgtNacgu', 3).tolist()] == ['ACG', 'CGT', 'ACG', 'CGT']
+    assert kmer_codes('ACGTA', 2, canonical=True).tolist() == [1, 6, 1, 12]
+    assert kmer_codes('AC', 3).tolist() == []
+    assert kmer_code('TGCA') == 0b11100100
+    assert decode_kmer(kmer_code('GATTACA' * 4), 28) == 'GATTACA' * 4
+
+    long_seq = 'ACGTTGCAAGGTACCATG' * 3
+    assert [decode_kmer(code, 31) for code in kmer_codes(long_seq, 31).tolist()] == \
+        [long_seq[i:i+31] for i in range(len(long_seq) - 30)]
+
+    seq = 'ACGTTGCAANNGTAC' * 7
+    blocks = list(iter_kmer_codes(seq, 5, block_size=8))
+    assert np.concatenate(blocks).tolist() == kmer_codes(seq, 5).tolist()
+
+    try:
+        kmer_codes('ACGT', 33)
+        assert False
+    except ValueError:
+        pass
+
+
+# --------------------------------------------------
+def test_count_kmers() -> None:
+    """ Test count_kmers """
+
+    seq = 'CTTCGAAAGTTTGGGCCGAGTCTTACAGTCGGTCTTGAAGCAAAGTAACGAACTCCACGG'
+    expected = Counter(seq[i:i+2] for i in range(len(seq) - 1))
+    histogram = count_kmers(seq, 2)
+
+    assert {decode_kmer(code, 2): int(count) for code, count in enumerate(histogram) if count} == expected
+    assert count_kmers(seq, 2, canonical=True).sum() == len(seq) - 1
+
+    counts = count_kmers(seq * 3, 13)
+    assert isinstance(counts, Counter)
+    assert sum(counts.values()) == 3 * len(seq) - 12
+    assert counts[kmer_code(seq[:13])] == 3
+    assert isinstance(count_kmers(seq, MAX_HISTOGRAM_K + 1), Counter)
+
+    # large k fill the dense histogram from the few distinct codes of each block
+    histogram = count_kmers(seq * 3, 10)
+    assert histogram.dtype == np.uint32 and histogram.sum() == 3 * len(seq) - 9
+    assert histogram[kmer_code(seq[:10])] == 3
+
+
+# --------------------------------------------------
+def test_kmer_composition(tmp_path) -> None:
+    """ Test kmer_composition """
+
+    fasta = tmp_path / 'seqs.fa'
+    fasta.write_text('>a\nAAAC\n>b\nGG\n')
+    composition = kmer_composition([str(fasta)], k=2)
+
+    assert list(composition) == ['a', 'b']
+    assert composition['a'][:2].tolist() == [2, 1]
+    assert composition['b'].tolist() == [0] * 10 + [1] + [0] * 5
+
+    long_fasta = tmp_path / 'long.fa'
+    long_fasta.write_text('>c\n' + 'ACGT' * 4 + '\n')
+    sparse = kmer_composition([str(long_fasta)], k=MAX_HISTOGRAM_K + 1)
+    assert sparse == {'c': Counter({kmer_code(('ACGT' * 4)[i:i+13]): 1 for i in range(4)})}
+    assert kmer_composition([str(fasta)], k=3)['a'].sum() == 2
@@ -4,50 +4,90 @@ Date   : 2024-05-27
 Purpose: Functions for mathematical operations
 """
 
-from functools import lru_cache
+from typing import Iterator, List
+from collections import deque
 
 
 # --------------------------------------------------
-@lru_cache()
-def fib(gen, lit):
-    """ Recusively calculate Fibonacci sequence """
+def _mat_mult(a: List[List[int]], b: List[List[int]]) -> List[List[int]]:
+    """ Multiply two 2x2 matrices """
+
+    return [[a[0][0]*b[0][0] + a[0][1]*b[1][0], a[0][0]*b[0][1] + a[0][1]*b[1][1]],
+            [a[1][0]*b[0][0] + a[1][1]*b[1][0], a[1][0]*b[0][1] + a[1][1]*b[1][1]]]
 
-    litter_size = 0
 
-    if gen <1:
+# --------------------------------------------------
+def fib(gen, lit):
+    """ Calculate Fibonacci sequence by matrix exponentiation in O(log n) steps """
+
+    if gen < 1:
         return 0
 
-    if gen in (1,2):
+    if gen in (1, 2):
         return 1
 
-    litter_size = fib(gen-1, lit) + fib(gen-2, lit)*lit
+    # [[F(n), ...], [F(n-1), ...]] = [[1, lit], [1, 0]]^(n-2) applied to F(2) = F(1) = 1
+    result = [[1, 0], [0, 1]]
+    base = [[1, lit], [1, 0]]
+    power = gen - 2
+
+    while power:
+        if power & 1:
+            result = _mat_mult(result, base)
+        base = _mat_mult(base, base)
+        power >>= 1
 
-    return litter_size
+    return result[0][0] + result[0][1]
 
 
 # --------------------------------------------------
-@lru_cache()
-def fibd(gen, months, litter=1):
-    """ Recusively calculate Fibonacci sequence with mortal rabbits """
+def iter_fib(gen, lit) -> Iterator[int]:
+    """ Yield rabbit pairs for generations 1 to gen in one pass """
+
+    current, previous = 1, 0
+
+    for _ in range(gen):
+        yield current
+        current, previous = current + previous*lit, current
+
+
+# --------------------------------------------------
+def iter_fibd(gen, months, litter=1) -> Iterator[List[int]]:
+    """ Yield [alive pairs, newborn pairs] of generations 1 to gen, O(months) memory """
+
+    # ring buffer of the newborns of the last months generations, and their sum
+    newborns = deque([0] * (months - 1) + [1], maxlen=max(months, 1))
+    window = sum(newborns)
 
-    litter_size = 0
-    pregnancies = 0
+    for current in range(1, gen + 1):
+        if current == 1:
+            alive, born = 1, 0
+        elif current == 2:
+            alive, born = 1, litter
+        elif months < 1:
+            alive, born = 0, 0
+        else:
+            alive = window
+            born = litter * (window - newborns[-1])
+
+        window += born - newborns[0] if len(newborns) == newborns.maxlen else born
+        newborns.append(born)
+        yield [alive, born]
+
+
+# --------------------------------------------------
+def fibd(gen, months, litter=1):
+    """ Calculate Fibonacci sequence with mortal rabbits """
 
-    if gen == 1:
-        return [1, 0]
-    if gen == 2:
-        return [1, litter]
     if gen == 0:
         return [0, 1]
-    if gen <= 0:
+    if gen < 0:
         return [0, 0]
 
-    for i in range(months+1)[1:]:
-        litter_size += fibd(gen-i, months, litter)[1]
-    for i in range(months+1)[2:]:
-        pregnancies += (fibd(gen-i, months, litter)[1])*litter
+    for counts in iter_fibd(gen, months, litter):
+        pass
 
-    return [litter_size, pregnancies]
+    return counts
 
 
 # --------------------------------------------------
@@ -59,4 +99,28 @@ def dom_prob(k: int, m: int, n: int):
                       + m/2 + (m*k)/(2*(summed-1)) + ((m-1)*m)/(4*(summed-1)) 
                       + (n*k)/(summed-1) + (n*m)/(2*(summed-1)))
 
-    return prob
\ No newline at end of file
+    return prob
+
+
+# --------------------------------------------------
+def test_fib() -> None:
+    """ Test fib and iter_fib """
+
+    assert fib(0, 3) == 0
+    assert fib(5, 3) == 19
+    assert [fib(gen, 1) for gen in range(1, 11)] == [1, 1, 2, 3, 5, 8, 13, 21, 34, 55]
+    assert list(iter_fib(10, 1)) == [fib(gen, 1) for gen in range(1, 11)]
+    assert list(iter_fib(0, 2)) == []
+    assert fib(300, 1) == 222232244629420445529739893461909967206666939096499764990979600
+
+
+# --------------------------------------------------
+def test_fibd() -> None:
+    """ Test fibd and iter_fibd """
+
+    assert fibd(6, 3)[0] == 4
+    assert fibd(0, 3) == [0, 1]
+    assert fibd(-1, 3) == [0, 0]
+    assert [alive for alive, _ in iter_fibd(6, 3)] == [1, 1, 2, 2, 3, 4]
+    assert fibd(80, 20)[0] == 23373970137148875
+    assert fibd(5, 0, 2) == [0, 0]
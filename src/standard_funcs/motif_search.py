@@ -0,0 +1,181 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Exact multi-pattern (Aho-Corasick) and mismatch tolerant motif search
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from collections import deque
+import numpy as np
+
+_COMPLEMENT = str.maketrans('ACGTUacgtuNn', 'TGCAAtgcaaNn')
+
+
+# --------------------------------------------------
+class MotifAutomaton:
+    """ Aho-Corasick automaton reporting all, also overlapping, occurrences of many motifs """
+
+    def __init__(self, motifs: Iterable[str]):
+        self.motifs = list(dict.fromkeys(motif for motif in motifs if motif))
+
+        transitions: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+
+        for index, motif in enumerate(self.motifs):
+            state = 0
+            for char in motif:
+                if char not in transitions[state]:
+                    transitions.append({})
+                    outputs.append([])
+                    transitions[state][char] = len(transitions) - 1
+                state = transitions[state][char]
+            outputs[state].append(index)
+
+        # breadth first, completing every state to a full transition table
+        alphabet = {char for motif in self.motifs for char in motif}
+        fail = [0] * len(transitions)
+        queue = deque()
+
+        for char in alphabet:
+            child = transitions[0].get(char)
+            if child is None:
+                transitions[0][char] = 0
+            else:
+                queue.append(child)
+
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for char in alphabet:
+                child = transitions[state].get(char)
+                if child is None:
+                    transitions[state][char] = transitions[fail[state]][char]
+                else:
+                    fail[child] = transitions[fail[state]][char]
+                    queue.append(child)
+
+        self._transitions = transitions
+        self._outputs = outputs
+        self._lengths = [len(motif) for motif in self.motifs]
+
+    def iter_matches(self, sequence: str) -> Iterator[Tuple[int, int]]:
+        """ Yield (motif index, start position) in one pass over the sequence """
+
+        transitions, outputs, lengths = self._transitions, self._outputs, self._lengths
+        state = 0
+
+        for pos, char in enumerate(sequence):
+            state = transitions[state].get(char, 0)
+            for index in outputs[state]:
+                yield index, pos - lengths[index] + 1
+
+    def search(self, sequence: str) -> Dict[str, np.ndarray]:
+        """ Start positions of every motif in the sequence """
+
+        hits = [[] for _ in self.motifs]
+        for index, start in self.iter_matches(str(sequence)):
+            hits[index].append(start)
+
+        return {motif: np.array(sorted(positions), dtype=np.int64) for motif, positions in zip(self.motifs, hits)}
+
+
+# --------------------------------------------------
+def find_approx_motifs(sequence: str, motif: str, max_mismatches: int = 0,
+                       chunk_size: int = 1 << 22) -> np.ndarray:
+    """ Start positions where motif occurs with at most max_mismatches substitutions """
+
+    text = np.frombuffer(str(sequence).encode('ascii'), dtype=np.uint8)
+    pattern = motif.encode('ascii')
+    num_windows = len(text) - len(pattern) + 1
+
+    if not pattern or num_windows < 1:
+        return np.zeros(0, dtype=np.int64)
+
+    hits = []
+
+    # all windows of a chunk are compared in parallel, one motif position at a time
+    for start in range(0, num_windows, chunk_size):
+        count = min(chunk_size, num_windows - start)
+        mismatches = np.zeros(count, dtype=np.int32)
+        for offset, base in enumerate(pattern):
+            mismatches += text[start+offset:start+offset+count] != base
+        hits.append(np.flatnonzero(mismatches <= max_mismatches) + start)
+
+    return np.concatenate(hits).astype(np.int64)
+
+
+# --------------------------------------------------
+def find_multi_motifs(sequences: Dict[str, str], motifs: Iterable[str], both_strands: bool = False,
+                      max_mismatches: int = 0,
+                      progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Dict[Tuple[str, str], np.ndarray]]:
+    """ Positions of all motifs on one or both strands of every sequence """
+
+    motifs = list(dict.fromkeys(motif for motif in motifs if motif))
+    patterns = {(motif, '+'): motif for motif in motifs}
+
+    # hits of the reverse complement on the forward strand are motif hits on the reverse strand
+    if both_strands:
+        patterns.update({(motif, '-'): motif.translate(_COMPLEMENT)[::-1] for motif in motifs})
+
+    results = {}
+
+    automaton = MotifAutomaton(patterns.values()) if max_mismatches <= 0 else None
+
+    for seq_id, sequence in sequences.items():
+        if automaton is None:
+            results[seq_id] = {key: find_approx_motifs(sequence, pattern, max_mismatches)
+                               for key, pattern in patterns.items()}
+        else:
+            hits = automaton.search(sequence)
+            results[seq_id] = {key: hits[pattern] for key, pattern in patterns.items()}
+        if progress:
+            progress(len(results), len(sequences))
+
+    return results
+
+
+# --------------------------------------------------
+def test_motif_automaton() -> None:
+    """ Test MotifAutomaton """
+
+    automaton = MotifAutomaton(['he', 'she', 'his', 'hers', ''])
+
+    assert sorted(automaton.iter_matches('ushers')) == [(0, 2), (1, 1), (3, 2)]
+    hits = automaton.search('ushers')
+    assert hits['he'].tolist() == [2]
+    assert hits['his'].tolist() == []
+    assert MotifAutomaton(['AA']).search('AAAA')['AA'].tolist() == [0, 1, 2]
+    assert MotifAutomaton([]).search('ACGT') == {}
+
+
+# --------------------------------------------------
+def test_find_multi_motifs() -> None:
+    """ Test find_multi_motifs """
+
+    hits = find_multi_motifs({'s1': 'GATATATGCATATACTT', 's2': 'ACGT'}, ['ATAT', 'ACG'], both_strands=True)
+
+    assert hits['s1'][('ATAT', '+')].tolist() == [1, 3, 9]
+    assert hits['s1'][('ATAT', '-')].tolist() == [1, 3, 9]
+    assert hits['s2'][('ACG', '+')].tolist() == [0]
+    assert hits['s2'][('ACG', '-')].tolist() == [1]
+    assert find_multi_motifs({'s1': 'ACGT'}, ['TT'])['s1'][('TT', '+')].tolist() == []
+
+    steps = []
+    find_multi_motifs({'s1': 'ACGT', 's2': 'TT'}, ['TT'], progress=lambda done, total: steps.append((done, total)))
+    assert steps == [(1, 2), (2, 2)]
+
+
+# --------------------------------------------------
+def test_find_approx_motifs() -> None:
+    """ Test find_approx_motifs """
+
+    assert find_approx_motifs('ACGTTACGAACGT', 'ACGT').tolist() == [0, 9]
+    assert find_approx_motifs('ACGTTACGAACGT', 'ACGT', 1).tolist() == [0, 5, 9]
+    assert find_approx_motifs('ACGTTACGAACGT', 'ACGT', 1, chunk_size=2).tolist() == [0, 5, 9]
+    assert find_approx_motifs('ACGTTACGAACGT', 'ACGT', 4).tolist() == list(range(10))
+    assert find_approx_motifs('AC', 'ACGT', 2).tolist() == []
+    assert find_approx_motifs('ACGT', '').tolist() == []
+
+    hits = find_multi_motifs({'s1': 'TTACGA'}, ['ACGT'], both_strands=True, max_mismatches=1)
+    assert hits['s1'][('ACGT', '+')].tolist() == [2]
+    assert hits['s1'][('ACGT', '-')].tolist() == [2]
@@ -0,0 +1,107 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Open reading frame scanner over streamed fastx records
+"""
+
+from typing import Iterator, List, NamedTuple
+import numpy as np
+from .fastx_handling import iter_records
+from .translation import FRAMES, iter_frame_blocks, translate_codons
+
+_START = ord('M')
+_STOP = ord('*')
+
+
+# --------------------------------------------------
+class ORF(NamedTuple):
+    """ Open reading frame, start and end are 0-based, half-open forward strand coordinates """
+
+    seq_id: str
+    strand: str
+    frame: int
+    start: int
+    end: int
+    protein: str
+
+
+# --------------------------------------------------
+def find_orfs(seq_id: str, sequence: str, min_length: int = 30, nested: bool = False,
+              block_codons: int = 1 << 20) -> List[ORF]:
+    """ ORFs from a start codon to the next stop codon on both strands, sorted by start """
+
+    orfs = []
+    sequence = str(sequence)
+    seq_len = len(sequence)
+
+    for frame in FRAMES:
+        offset = abs(frame) - 1
+        # start codons after the last stop, carried over into the next block while their ORF is open
+        open_starts = np.zeros(0, dtype=np.int64)
+
+        for first, block in iter_frame_blocks(sequence, frame, block_codons):
+            stops = np.flatnonzero(block == _STOP) + first
+            starts = np.concatenate((open_starts, np.flatnonzero(block == _START) + first))
+            # index of the stop closing each start, len(stops) while its ORF is still open
+            segments = np.searchsorted(stops, starts)
+            closed = segments < len(stops)
+            if not nested:
+                closed &= np.concatenate(([True], segments[1:] != segments[:-1]))
+
+            orf_stops = stops[segments[closed]]
+            long_enough = orf_stops - starts[closed] >= min_length
+
+            for start, stop in zip(starts[closed][long_enough].tolist(), orf_stops[long_enough].tolist()):
+                protein = block[start - first:stop - first] if start >= first else \
+                    translate_codons(sequence, frame, start, stop)
+                nt_start, nt_end = offset + 3*start, offset + 3*(stop + 1)
+                if frame < 0:
+                    nt_start, nt_end = seq_len - nt_end, seq_len - nt_start
+                orfs.append(ORF(seq_id, '+' if frame > 0 else '-', frame,
+                                nt_start, nt_end, protein.tobytes().decode()))
+
+            open_starts = starts[segments == len(stops)]
+            if not nested:
+                open_starts = open_starts[:1]
+
+    return sorted(orfs, key=lambda orf: (orf.start, orf.end))
+
+
+# --------------------------------------------------
+def scan_orfs(files: List[str], min_length: int = 30, nested: bool = False) -> Iterator[ORF]:
+    """ Stream ORFs of all records, one record in memory at a time """
+
+    for rec in iter_records(files):
+        yield from find_orfs(rec.id, rec.seq, min_length, nested)
+
+
+# --------------------------------------------------
+def test_find_orfs() -> None:
+    """ Test find_orfs """
+
+    seq = ('AGCCATGTAGCTAACTCAGGTTACATGGGGATGACCCCGCGACTTGGATTAGAGTCTCTTTTGGAATAAG'
+           'CCTGAATGATCCGAGTAGCATCTCAG')
+
+    assert {orf.protein for orf in find_orfs('s', seq, min_length=1, nested=True)} == {
+        'MLLGSFRLIPKETLIQVAGSSPCNLS', 'M', 'MGMTPRLGLESLLE', 'MTPRLGLESLLE'}
+    assert {orf.protein for orf in find_orfs('s', seq, min_length=1)} == {
+        'MLLGSFRLIPKETLIQVAGSSPCNLS', 'M', 'MGMTPRLGLESLLE'}
+    assert [orf.protein for orf in find_orfs('s', seq, min_length=20)] == ['MLLGSFRLIPKETLIQVAGSSPCNLS']
+
+    assert find_orfs('s', 'CCATGAAATAGCC', min_length=1) == [ORF('s', '+', 3, 2, 11, 'MK')]
+    assert find_orfs('s', 'GGCTATTTCATGG', min_length=1) == [ORF('s', '-', -3, 2, 11, 'MK')]
+
+    # ORFs open across block edges are carried into the next block
+    for nested in (False, True):
+        assert find_orfs('s', seq, min_length=1, nested=nested, block_codons=2) == \
+            find_orfs('s', seq, min_length=1, nested=nested)
+
+
+# --------------------------------------------------
+def test_scan_orfs(tmp_path) -> None:
+    """ Test scan_orfs """
+
+    fasta = tmp_path / 'genome.fa'
+    fasta.write_text('>chr1\nCCATGAAATAGCC\n>chr2\nGGCTATTTCATGG\n')
+
+    assert [(orf.seq_id, orf.strand) for orf in scan_orfs([str(fasta)], min_length=2)] == [('chr1', '+'), ('chr2', '-')]
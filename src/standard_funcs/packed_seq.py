@@ -0,0 +1,226 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: 2-bit packed nucleotide sequences
+"""
+
+from typing import Dict, Tuple, Union
+import numpy as np
+
+# A, C, G, T are stored as 0-3, four bases per byte, first base in the high bits
+_ENCODE = np.full(256, 255, dtype=np.uint8)
+for _code, _base in enumerate(b'ACGT'):
+    _ENCODE[_base] = _code
+    _ENCODE[ord(chr(_base).lower())] = _code
+
+_DECODE = np.frombuffer(b'ACGT', dtype=np.uint8)
+
+_IUPAC_COMPLEMENT = bytes.maketrans(b'ACGTUNRYSWKMBDHV', b'TGCAANYRSWMKVHDB')
+
+# Per byte: the four packed codes, their counts, and the byte's reverse complement
+_BYTE_CODES = np.stack([(np.arange(256) >> shift) & 3 for shift in (6, 4, 2, 0)], axis=1).astype(np.uint8)
+_BYTE_COUNTS = np.stack([(_BYTE_CODES == code).sum(axis=1) for code in range(4)], axis=1)
+_BYTE_REVC = ((3 - _BYTE_CODES[:, ::-1]) << np.array([6, 4, 2, 0])).sum(axis=1).astype(np.uint8)
+
+
+# --------------------------------------------------
+def _pack(codes: np.ndarray) -> np.ndarray:
+    """ Pack an array of 2-bit codes four to a byte """
+
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+
+    return (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+
+
+# --------------------------------------------------
+def _mask_runs(raw: np.ndarray, masked: np.ndarray, offset: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ (start, length, symbol) of the runs of one repeated masked symbol in a block of bytes """
+
+    changed = raw[1:] != raw[:-1]
+    begins = masked.copy()
+    begins[1:] &= ~masked[:-1] | changed
+    ends = masked.copy()
+    ends[:-1] &= ~masked[1:] | changed
+
+    starts = np.flatnonzero(begins)
+
+    return starts + offset, np.flatnonzero(ends) + 1 - starts, raw[starts]
+
+
+# --------------------------------------------------
+def _merge_runs(starts: np.ndarray, lengths: np.ndarray, chars: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ Join runs of the same symbol that touch, as happens at block edges """
+
+    if not len(starts):
+        return starts, lengths, chars
+
+    touching = (starts[1:] == starts[:-1] + lengths[:-1]) & (chars[1:] == chars[:-1])
+    firsts = np.flatnonzero(np.concatenate(([True], ~touching)))
+
+    return starts[firsts], np.add.reduceat(lengths, firsts), chars[firsts]
+
+
+# --------------------------------------------------
+class PackedSeq:
+    """ Nucleotide sequence stored at 2 bits per base, other symbols kept as (start, length, symbol) runs """
+
+    __slots__ = ('_packed', '_length', '_mask_start', '_mask_len', '_mask_chr')
+
+    def __init__(self, sequence: str = '', block_size: int = 1 << 20):
+        # encoded block by block so temporaries stay block sized, blocks hold whole bytes of four bases
+        block_size = max(4, block_size - block_size % 4)
+        blocks = [np.zeros(0, dtype=np.uint8)]
+        runs = [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8))]
+
+        for start in range(0, len(sequence), block_size):
+            raw = np.frombuffer(sequence[start:start + block_size].upper().encode('ascii'), dtype=np.uint8)
+            codes = _ENCODE[raw]
+            masked = codes == 255
+            runs.append(_mask_runs(raw, masked, start))
+            codes[masked] = 0
+            blocks.append(_pack(codes))
+
+        self._packed = np.concatenate(blocks)
+        self._length = len(sequence)
+        self._mask_start, self._mask_len, self._mask_chr = _merge_runs(*(np.concatenate(parts) for parts in zip(*runs)))
+
+    @classmethod
+    def _from_parts(cls, packed: np.ndarray, length: int, mask_start: np.ndarray, mask_len: np.ndarray,
+                    mask_chr: np.ndarray) -> 'PackedSeq':
+        """ Build from already packed data """
+
+        new = cls.__new__(cls)
+        new._packed, new._length = packed, length
+        new._mask_start, new._mask_len, new._mask_chr = mask_start, mask_len, mask_chr
+
+        return new
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        raw = _DECODE[self._codes(0, self._length)]
+
+        # positions of all masked bases, each run counting up from its start
+        total = int(self._mask_len.sum())
+        run_offsets = np.repeat(self._mask_start - (np.cumsum(self._mask_len) - self._mask_len), self._mask_len)
+        raw[run_offsets + np.arange(total)] = np.repeat(self._mask_chr, self._mask_len)
+
+        return raw.tobytes().decode()
+
+    def __repr__(self) -> str:
+        preview = str(self[:20]) + ('...' if self._length > 20 else '')
+
+        return f'PackedSeq({preview!r}, length={self._length})'
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PackedSeq, str)):
+            return str(self) == str(other)
+
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, 'PackedSeq']:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return PackedSeq(str(self)[index])
+
+            stop = max(start, stop)
+            ends = self._mask_start + self._mask_len
+            lo, hi = np.searchsorted(ends, start, side='right'), np.searchsorted(self._mask_start, stop)
+            starts = np.maximum(self._mask_start[lo:hi], start)
+
+            return PackedSeq._from_parts(_pack(self._codes(start, stop)), stop - start, starts - start,
+                                         np.minimum(ends[lo:hi], stop) - starts, self._mask_chr[lo:hi])
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('PackedSeq index out of range')
+
+        return str(self[index:index+1])
+
+    def _codes(self, start: int, stop: int) -> np.ndarray:
+        """ Unpack the 2-bit codes of positions start to stop """
+
+        if start >= stop:
+            return np.zeros(0, dtype=np.uint8)
+
+        codes = _BYTE_CODES[self._packed[start // 4:(stop - 1) // 4 + 1]].ravel()
+        offset = start - (start // 4) * 4
+
+        return codes[offset:offset + stop - start]
+
+    def count_bases(self) -> Dict[str, int]:
+        """ Count bases from the packed bytes without unpacking """
+
+        counts = np.bincount(self._packed, minlength=256) @ _BYTE_COUNTS
+
+        # padding and masked positions are stored as A
+        counts[0] -= len(self._packed) * 4 - self._length + int(self._mask_len.sum())
+
+        counter = {base: int(count) for base, count in zip('ACGT', counts) if count}
+        masked = np.bincount(self._mask_chr, weights=self._mask_len, minlength=256)
+        for char in np.flatnonzero(masked):
+            counter[chr(char)] = int(masked[char])
+
+        return counter
+
+    def gc_count(self) -> int:
+        """ Number of G and C bases """
+
+        counts = self.count_bases()
+
+        return counts.get('G', 0) + counts.get('C', 0)
+
+    def reverse_complement(self) -> 'PackedSeq':
+        """ Reverse complement, computed byte-wise on the packed data """
+
+        revc = _BYTE_REVC[self._packed[::-1]]
+        shift = 2 * (len(self._packed) * 4 - self._length)
+
+        # padding moved to the front, shift it back behind the last base
+        if shift:
+            following = np.append(revc[1:], np.uint8(0))
+            revc = ((revc << shift) | (following >> (8 - shift))).astype(np.uint8)
+
+        mask_chr = np.frombuffer(self._mask_chr.tobytes().translate(_IUPAC_COMPLEMENT)[::-1], dtype=np.uint8)
+
+        return PackedSeq._from_parts(revc, self._length, (self._length - self._mask_start - self._mask_len)[::-1],
+                                     self._mask_len[::-1], mask_chr)
+
+
+# --------------------------------------------------
+def test_packed_seq() -> None:
+    """ Test PackedSeq """
+
+    seq = 'ACGTNACGGTRAc'
+    packed = PackedSeq(seq)
+
+    assert len(packed) == 13
+    assert str(packed) == seq.upper()
+    assert packed == seq.upper()
+    assert packed[2] == 'G'
+    assert packed[-1] == 'C'
+    assert str(packed[3:11]) == 'TNACGGTR'
+    assert str(packed[::2]) == 'AGNCGRC'
+    assert packed.count_bases() == {'A': 3, 'C': 3, 'G': 3, 'T': 2, 'N': 1, 'R': 1}
+    assert packed.gc_count() == 6
+    assert str(packed.reverse_complement()) == 'GTYACCGTNACGT'
+    assert str(packed[1:].reverse_complement()) == 'GTYACCGTNACG'
+    assert str(PackedSeq('')) == ''
+    assert PackedSeq('').count_bases() == {}
+
+    # masked bases are stored as runs, also across block edges
+    scaffold = 'ACGT' + 'N' * 1000 + 'ACNNRRGT' + 'n' * 7
+    packed = PackedSeq(scaffold, block_size=8)
+    assert len(packed._mask_chr) == 4 and packed._mask_len.tolist() == [1000, 2, 2, 7]
+    assert str(packed) == scaffold.upper()
+    assert str(packed[1000:1012]) == scaffold.upper()[1000:1012]
+    assert packed.count_bases() == {'A': 2, 'C': 2, 'G': 2, 'T': 2, 'N': 1009, 'R': 2}
+    assert str(packed.reverse_complement()) == scaffold.upper().encode().translate(_IUPAC_COMPLEMENT)[::-1].decode()
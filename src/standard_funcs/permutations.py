@@ -0,0 +1,143 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Iterative, rankable permutation and signed permutation engine
+"""
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+import itertools
+import math
+
+
+# --------------------------------------------------
+def count_perms(n: int) -> int:
+    """ Number of permutations of n items """
+
+    return math.factorial(n)
+
+
+# --------------------------------------------------
+def count_signed_perms(n: int) -> int:
+    """ Number of signed permutations of n items """
+
+    return 2**n * math.factorial(n)
+
+
+# --------------------------------------------------
+def perm_unrank(rank: int, items: Sequence) -> Tuple:
+    """ Permutation at a lexicographic rank (order of the given items) """
+
+    remaining = list(items)
+    perm = []
+
+    for position in range(len(remaining), 0, -1):
+        index, rank = divmod(rank, math.factorial(position - 1))
+        perm.append(remaining.pop(index))
+
+    return tuple(perm)
+
+
+# --------------------------------------------------
+def perm_rank(perm: Sequence, items: Sequence) -> int:
+    """ Lexicographic rank of a permutation of items """
+
+    remaining = list(range(len(items)))
+    positions = {item: index for index, item in enumerate(items)}
+    rank = 0
+
+    for position, item in enumerate(perm):
+        index = remaining.index(positions[item])
+        rank += index * math.factorial(len(items) - position - 1)
+        remaining.pop(index)
+
+    return rank
+
+
+# --------------------------------------------------
+def _next_perm(indexes: List[int]) -> bool:
+    """ Step index list to the next lexicographic permutation in place """
+
+    i = len(indexes) - 2
+    while i >= 0 and indexes[i] >= indexes[i+1]:
+        i -= 1
+    if i < 0:
+        return False
+
+    j = len(indexes) - 1
+    while indexes[j] <= indexes[i]:
+        j -= 1
+
+    indexes[i], indexes[j] = indexes[j], indexes[i]
+    indexes[i+1:] = reversed(indexes[i+1:])
+
+    return True
+
+
+# --------------------------------------------------
+def iter_perms(items: Sequence, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple]:
+    """ Yield permutations with lexicographic rank in [start, stop) as tuples """
+
+    items = tuple(items)
+    total = count_perms(len(items))
+    stop = total if stop is None else min(stop, total)
+
+    if start >= stop:
+        return
+
+    if start == 0:
+        yield from itertools.islice(itertools.permutations(items), stop)
+        return
+
+    indexes = list(perm_unrank(start, range(len(items))))
+    for _ in range(stop - start):
+        yield tuple(items[index] for index in indexes)
+        _next_perm(indexes)
+
+
+# --------------------------------------------------
+def perm_chunks(n: int, num_chunks: int) -> List[Tuple[int, int]]:
+    """ Split the rank space of n items into (start, stop) ranges for parallel workers """
+
+    total = count_perms(n)
+    size = -(-total // max(num_chunks, 1))
+
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+# --------------------------------------------------
+def iter_signed_perms(items: Sequence[int]) -> Iterator[Tuple[int, ...]]:
+    """ Yield every permutation with every combination of signs """
+
+    for perm in iter_perms(items):
+        for signs in itertools.product((1, -1), repeat=len(perm)):
+            yield tuple(sign * item for sign, item in zip(signs, perm))
+
+
+# --------------------------------------------------
+def test_iter_perms() -> None:
+    """ Test iter_perms, perm_rank, perm_unrank and perm_chunks """
+
+    perms = list(iter_perms('ABC'))
+
+    assert perms == [('A', 'B', 'C'), ('A', 'C', 'B'), ('B', 'A', 'C'),
+                     ('B', 'C', 'A'), ('C', 'A', 'B'), ('C', 'B', 'A')]
+    assert list(iter_perms('ABC', 2, 4)) == perms[2:4]
+    assert list(iter_perms('ABC', 5, 100)) == perms[5:]
+    assert list(iter_perms([])) == [()]
+    assert [perm_rank(perm, 'ABC') for perm in perms] == list(range(6))
+    assert [perm_unrank(rank, 'ABC') for rank in range(6)] == perms
+
+    chunks = perm_chunks(4, 5)
+    assert chunks[0][0] == 0 and chunks[-1][1] == 24
+    assert [perm for start, stop in chunks for perm in iter_perms(range(4), start, stop)] == list(iter_perms(range(4)))
+    assert count_perms(10) == 3628800
+
+
+# --------------------------------------------------
+def test_iter_signed_perms() -> None:
+    """ Test iter_signed_perms """
+
+    signed = list(iter_signed_perms([1, 2]))
+
+    assert len(signed) == count_signed_perms(2) == 8
+    assert signed[:4] == [(1, 2), (1, -2), (-1, 2), (-1, -2)]
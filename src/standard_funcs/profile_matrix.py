@@ -0,0 +1,126 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Profile matrix and consensus of many sequences with NumPy
+"""
+
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+
+# --------------------------------------------------
+class Profile(NamedTuple):
+    """ Symbols, per column counts (one row per symbol) and consensus """
+
+    alphabet: str
+    counts: np.ndarray
+    consensus: str
+
+
+# --------------------------------------------------
+def _accumulate(symbols: np.ndarray, counts: np.ndarray, chunk: List[str],
+                upper: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """ Add the counts of a chunk of sequences, one int32 row per symbol seen so far, rows in byte order """
+
+    width = max(len(seq) for seq in chunk)
+
+    if width > counts.shape[1]:
+        counts = np.pad(counts, ((0, 0), (0, width - counts.shape[1])))
+
+    # byte 0 pads shorter sequences and is never counted
+    chunk_mat = np.zeros((len(chunk), width), dtype=np.uint8)
+    for row, seq in enumerate(chunk):
+        raw = (seq.upper() if upper else seq).encode('ascii')
+        chunk_mat[row, :len(raw)] = np.frombuffer(raw, dtype=np.uint8)
+
+    present = np.flatnonzero(np.bincount(chunk_mat.ravel(), minlength=256)[1:]) + 1
+    new_symbols = np.setdiff1d(present, symbols)
+    if len(new_symbols):
+        symbols = np.concatenate((symbols, new_symbols))
+        counts = np.concatenate((counts, np.zeros((len(new_symbols), counts.shape[1]), dtype=np.int32)))
+        order = np.argsort(symbols)
+        symbols, counts = symbols[order], counts[order]
+
+    for symbol in present:
+        row = int(np.searchsorted(symbols, symbol))
+        counts[row, :width] += (chunk_mat == symbol).sum(axis=0, dtype=np.int32)
+
+    return symbols, counts
+
+
+# --------------------------------------------------
+def get_profile(seqs: Iterable[str], chunk_bytes: int = 1 << 24, upper: bool = False,
+                progress: Optional[Callable[[int, int], None]] = None) -> Profile:
+    """ Build the profile matrix and consensus, reading sequences in chunks of about chunk_bytes """
+
+    symbols = np.zeros(0, dtype=np.int64)
+    counts = np.zeros((0, 0), dtype=np.int32)
+    chunk = []
+    chunk_width = 0
+    total = len(seqs) if hasattr(seqs, '__len__') else 0
+    done = 0
+
+    for seq in seqs:
+        seq = str(seq)
+        # the chunk matrix is padded to its longest sequence
+        if chunk and (len(chunk) + 1) * max(chunk_width, len(seq)) > chunk_bytes:
+            symbols, counts = _accumulate(symbols, counts, chunk, upper)
+            done += len(chunk)
+            chunk, chunk_width = [], 0
+            if progress:
+                progress(done, total)
+        chunk.append(seq)
+        chunk_width = max(chunk_width, len(seq))
+
+    if chunk:
+        symbols, counts = _accumulate(symbols, counts, chunk, upper)
+        if progress:
+            progress(done + len(chunk), total)
+
+    if not counts.size:
+        return Profile('', counts, '')
+
+    # rows are in byte order, so ties resolve alphabetically
+    consensus = symbols.astype(np.uint8)[counts.argmax(axis=0)].tobytes().decode()
+
+    return Profile(symbols.astype(np.uint8).tobytes().decode(), counts, consensus)
+
+
+# --------------------------------------------------
+def format_profile(profile: Profile) -> str:
+    """ Format profile matrix as in the CONS problem, A, C, G and T always first, then any other symbols """
+
+    rows = dict(zip(profile.alphabet, profile.counts.tolist()))
+    width = profile.counts.shape[1] if profile.counts.ndim == 2 else 0
+    symbols = ['A', 'C', 'G', 'T'] + [symbol for symbol in profile.alphabet if symbol not in 'ACGT']
+
+    return '\n'.join(f'{symbol}: {" ".join(str(x) for x in rows.get(symbol, [0] * width))}' for symbol in symbols)
+
+
+# --------------------------------------------------
+def test_get_profile() -> None:
+    """ Test get_profile """
+
+    profile = get_profile(['ATCCAGCT', 'GGGCAACT', 'ATGGATCT', 'AAGCAACC',
+                           'TTGGAACT', 'ATGCCATT', 'ATGGCACT'])
+
+    assert profile.consensus == 'ATGCAACT'
+    assert profile.alphabet == 'ACGT'
+    assert format_profile(profile) == ('A: 5 1 0 0 5 5 0 0\n'
+                                       'C: 0 0 1 4 2 0 6 1\n'
+                                       'G: 1 1 6 3 0 1 0 0\n'
+                                       'T: 1 5 0 0 0 1 1 6')
+    assert get_profile(['AC', 'AG', 'A'], chunk_bytes=4).consensus == 'AC'
+    assert format_profile(get_profile(['AAAA', 'AAAC'])) == ('A: 2 2 2 1\n'
+                                                            'C: 0 0 0 1\n'
+                                                            'G: 0 0 0 0\n'
+                                                            'T: 0 0 0 0')
+    assert format_profile(get_profile(['AN', 'TN'])) == 'A: 1 0\nC: 0 0\nG: 0 0\nT: 1 0\nN: 0 2'
+    assert format_profile(get_profile([])) == 'A: \nC: \nG: \nT: '
+
+    steps = []
+    get_profile(['AC', 'AG', 'A'], chunk_bytes=4, progress=lambda done, total: steps.append((done, total)))
+    assert steps == [(2, 3), (3, 3)]
+    assert get_profile(['ac', 'AC'], upper=True).consensus == 'AC'
+    assert get_profile([]).consensus == ''
+    assert get_profile(['', '']).consensus == ''
@@ -4,29 +4,238 @@ Date   : 2024-06-01
 Purpose: Functions for handling proteins
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence
+import numpy as np
+from .fastx_handling import iter_records
+
+AA_MASSES = {'A': 71.03711, 'C': 103.00919, 'D': 115.02694, 'E': 129.04259,
+             'F': 147.06841, 'G': 57.02146, 'H': 137.05891, 'I': 113.08406,
+             'K': 128.09496, 'L': 113.08406, 'M': 131.04049, 'N': 114.04293,
+             'P': 97.05276, 'Q': 128.05858, 'R': 156.10111, 'S': 87.03203,
+             'T': 101.04768, 'V': 99.06841, 'W': 186.07931, 'Y': 163.06333}
+
+WATER_MASS = 18.01056
+PROTON_MASS = 1.00728
+
+# monoisotopic mass per byte value, NaN for anything that is not an amino acid
+_MASS_TABLE = np.full(256, np.nan)
+for _aa, _mass in AA_MASSES.items():
+    _MASS_TABLE[ord(_aa)] = _mass
+    _MASS_TABLE[ord(_aa.lower())] = _mass
+
+# residues sorted by mass for spectrum lookups, I and L share a mass so only one is kept
+_RESIDUES = sorted({mass: aa for aa, mass in reversed(AA_MASSES.items())}.items())
+_RESIDUE_MASSES = np.array([mass for mass, _ in _RESIDUES])
+_RESIDUE_NAMES = [aa for _, aa in _RESIDUES]
+
+
+# --------------------------------------------------
+def residue_masses(sequence: str) -> np.ndarray:
+    """ Mass of every residue, raises KeyError on unknown symbols """
+
+    raw = str(sequence).encode('ascii', 'replace')
+    masses = _MASS_TABLE[np.frombuffer(raw, dtype=np.uint8)]
+
+    if np.isnan(masses).any():
+        raise KeyError(chr(raw[int(np.isnan(masses).argmax())]))
+
+    return masses
 
 
 # --------------------------------------------------
 def get_protein_mass(sequence: str) -> float:
     """ Get protein mass """
 
-    aa_masses = {'A': 71.03711, 'C': 103.00919, 'D': 115.02694, 'E': 129.04259,
-                 'F': 147.06841, 'G': 57.02146, 'H': 137.05891, 'I': 113.08406,
-                 'K': 128.09496, 'L': 113.08406, 'M': 131.04049, 'N': 114.04293,
-                 'P': 97.05276, 'Q': 128.05858, 'R': 156.10111, 'S': 87.03203,
-                 'T': 101.04768, 'V': 99.06841, 'W': 186.07931, 'Y': 163.06333}
+    return float(residue_masses(sequence).sum())
+
+
+# --------------------------------------------------
+def protein_masses(files: List[str]) -> Dict[str, float]:
+    """ Masses of all proteins of fastx files, looked up in one batch """
+
+    ids, seqs = [], []
+    for rec in iter_records(files):
+        ids.append(rec.id)
+        seqs.append(rec.seq)
+
+    lengths = np.array([len(seq) for seq in seqs], dtype=np.int64)
+    masses = np.zeros(len(seqs))
+
+    if lengths.sum():
+        residues = residue_masses(''.join(seqs))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        non_empty = lengths > 0
+        masses[non_empty] = np.add.reduceat(residues, starts[non_empty])
+
+    return dict(zip(ids, masses.tolist()))
+
+
+# --------------------------------------------------
+class MassIndex:
+    """ Prefix sums of residue masses for constant time prefix, suffix and fragment masses """
+
+    def __init__(self, sequence: str):
+        self.sequence = str(sequence)
+        self.prefix = np.concatenate(([0.0], np.cumsum(residue_masses(self.sequence))))
+
+    def __len__(self) -> int:
+        return len(self.sequence)
+
+    @property
+    def total(self) -> float:
+        """ Residue mass of the whole protein """
+
+        return float(self.prefix[-1])
+
+    def fragment_mass(self, start: int, end: int) -> float:
+        """ Residue mass of sequence[start:end] """
+
+        return float(self.prefix[end] - self.prefix[start])
+
+    def prefix_mass(self, length: int) -> float:
+        """ Residue mass of the first length residues """
+
+        return float(self.prefix[length])
+
+    def suffix_mass(self, length: int) -> float:
+        """ Residue mass of the last length residues """
+
+        return float(self.prefix[-1] - self.prefix[len(self) - length])
+
+    def b_ions(self) -> np.ndarray:
+        """ Singly charged b-ion masses, b1 to b(n-1) """
+
+        return self.prefix[1:-1] + PROTON_MASS
+
+    def y_ions(self) -> np.ndarray:
+        """ Singly charged y-ion masses, y1 to y(n-1) """
+
+        return (self.prefix[-1] - self.prefix[-2:0:-1]) + WATER_MASS + PROTON_MASS
+
 
-    weight = 0
+# --------------------------------------------------
+def _match_residues(differences: np.ndarray, tolerance: float) -> List[str]:
+    """ Amino acid closest to each mass difference, '' if none is within tolerance """
+
+    differences = np.asarray(differences, dtype=float)
+    right = np.clip(np.searchsorted(_RESIDUE_MASSES, differences), 1, len(_RESIDUE_MASSES) - 1)
+    left = right - 1
+    closest = np.where(np.abs(_RESIDUE_MASSES[left] - differences) <= np.abs(_RESIDUE_MASSES[right] - differences),
+                       left, right)
+    within = np.abs(_RESIDUE_MASSES[closest] - differences) <= tolerance
+
+    return [_RESIDUE_NAMES[index] if ok else '' for index, ok in zip(closest.tolist(), within.tolist())]
+
+
+# --------------------------------------------------
+def spectrum_to_protein(prefix_masses: Sequence[float], tolerance: float = 0.01) -> str:
+    """ Protein from its prefix spectrum (SPEC), raises ValueError on unmatched gaps """
+
+    residues = _match_residues(np.diff(np.sort(np.asarray(prefix_masses, dtype=float))), tolerance)
+
+    if '' in residues:
+        raise ValueError(f'No amino acid matches gap {residues.index("") + 1} of the spectrum.')
+
+    return ''.join(residues)
 
-    for aa in sequence.upper():
-        weight += aa_masses[aa]
 
-    return weight
+# --------------------------------------------------
+def ions_to_protein(parent_mass: float, ions: Sequence[float], tolerance: float = 0.01) -> str:
+    """ Protein from the b/y-ion pairs of its fragments (FULL), ValueError if ions do not pair up to parent_mass """
+
+    ions = np.sort(np.asarray(ions, dtype=float))
+    length = (len(ions) - 2) // 2
+
+    # every b-ion has a y-ion partner, together they weigh the parent mass
+    complements = parent_mass - ions
+    partners = np.clip(np.searchsorted(ions, complements), 0, max(len(ions) - 1, 0))
+    neighbours = np.clip(partners - 1, 0, None)
+    distance = np.minimum(np.abs(ions[partners] - complements), np.abs(ions[neighbours] - complements))
+
+    if (distance > tolerance).any():
+        raise ValueError(f'Ion {ions[int(distance.argmax())]:.5f} has no partner adding up to the parent mass.')
+
+    current = 0
+    protein = ''
+
+    while len(protein) < length:
+        residues = _match_residues(ions[current+1:] - ions[current], tolerance)
+        step = next((offset for offset, aa in enumerate(residues) if aa), None)
+        if step is None:
+            raise ValueError(f'No amino acid continues the ladder at {ions[current]:.5f}.')
+        protein += residues[step]
+        current += step + 1
+
+    return protein
 
 
 # --------------------------------------------------
 def test_get_protein_mass() -> None:
     """ Test get_protein_mass """
 
-    assert f'{get_protein_mass("SKADYEK"):.3f}' == '821.392'
\ No newline at end of file
+    assert f'{get_protein_mass("SKADYEK"):.3f}' == '821.392'
+    assert f'{get_protein_mass("skadyek"):.3f}' == '821.392'
+    assert get_protein_mass('') == 0
+
+    try:
+        get_protein_mass('SKBX')
+        assert False
+    except KeyError as err:
+        assert 'B' in str(err)
+
+
+# --------------------------------------------------
+def test_protein_masses(tmp_path) -> None:
+    """ Test protein_masses """
+
+    fasta = tmp_path / 'proteome.fa'
+    fasta.write_text('>a\nSKADYEK\n>b\n\n>c\nGA\n')
+    masses = protein_masses([str(fasta)])
+
+    assert list(masses) == ['a', 'b', 'c']
+    assert [round(mass, 3) for mass in masses.values()] == [821.392, 0, 128.059]
+
+
+# --------------------------------------------------
+def test_mass_index() -> None:
+    """ Test MassIndex """
+
+    index = MassIndex('SKADYEK')
+
+    assert len(index) == 7
+    assert round(index.total, 3) == 821.392
+    assert round(index.fragment_mass(1, 3), 5) == round(get_protein_mass('KA'), 5)
+    assert round(index.prefix_mass(2), 5) == round(get_protein_mass('SK'), 5)
+    assert round(index.suffix_mass(2), 5) == round(get_protein_mass('EK'), 5)
+    assert index.prefix_mass(0) == index.suffix_mass(0) == 0
+    assert len(index.b_ions()) == len(index.y_ions()) == 6
+    assert round(index.b_ions()[0], 5) == round(AA_MASSES['S'] + PROTON_MASS, 5)
+    assert round(index.y_ions()[0], 5) == round(AA_MASSES['K'] + WATER_MASS + PROTON_MASS, 5)
+
+
+# --------------------------------------------------
+def test_spectrum_to_protein() -> None:
+    """ Test spectrum_to_protein and ions_to_protein """
+
+    assert spectrum_to_protein([3524.8542, 3710.9335, 3841.974, 3970.0326, 4057.0646]) == 'WMQS'
+    assert spectrum_to_protein([4057.0646, 3524.8542, 3710.9335, 3841.974, 3970.0326]) == 'WMQS'
+
+    ions = [610.391039105, 738.485999105, 766.492149105, 863.544909105, 867.528589105, 992.587499105,
+            995.623549105, 1120.6824591, 1124.6661391, 1221.7188991, 1249.7250491, 1377.8200091]
+    assert ions_to_protein(1988.21104821, ions) == 'KEKEP'
+
+    try:
+        ions_to_protein(1988.21104821, ions[:-1] + [1300.0])
+        assert False
+    except ValueError as err:
+        assert 'parent mass' in str(err)
+
+    # the ladder of a known protein is read back from its prefix masses
+    index = MassIndex('PEPTIDE')
+    assert spectrum_to_protein(index.prefix) == 'PEPTIDE'
+
+    try:
+        spectrum_to_protein([100.0, 100.5])
+        assert False
+    except ValueError:
+        pass
@@ -0,0 +1,247 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Persistent on-disk cache for file summaries and derived results
+"""
+
+from typing import Any, Callable, Iterable, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'rosalind_solver')
+DEFAULT_MAX_BYTES = 512 * 1024**2
+
+# part of every key, bump it when a cached algorithm or result format changes
+CACHE_VERSION = 2
+
+
+# --------------------------------------------------
+def file_key(fh: str, hash_contents: bool = False) -> Tuple:
+    """ Identify a file version by path, size and mtime, or by content hash """
+
+    stat = os.stat(fh)
+
+    if hash_contents:
+        digest = hashlib.sha256()
+        with open(fh, 'rb') as handle:
+            for block in iter(lambda: handle.read(1024**2), b''):
+                digest.update(block)
+        return (os.path.abspath(fh), stat.st_size, digest.hexdigest())
+
+    return (os.path.abspath(fh), stat.st_size, stat.st_mtime_ns)
+
+
+# --------------------------------------------------
+class _CacheFull(Exception):
+    """ Raised while pickling a result that is larger than the cache """
+
+
+# --------------------------------------------------
+class _BoundedWriter:
+    """ File wrapper that stops pickling once max_bytes are written """
+
+    def __init__(self, handle, max_bytes: int):
+        self.handle = handle
+        self.max_bytes = max_bytes
+        self.written = 0
+
+    def write(self, data) -> int:
+        self.written += len(data)
+        if self.written > self.max_bytes:
+            raise _CacheFull
+        return self.handle.write(data)
+
+
+# --------------------------------------------------
+class ResultCache:
+    """ Size bounded LRU cache of pickled results, keyed on the input files """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 hash_contents: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hash_contents = hash_contents
+        # guards last-use updates, listing and eviction between worker threads
+        self._lock = threading.Lock()
+
+    def _path(self, namespace: str, files: Iterable[str], params: Tuple) -> str:
+        """ Cache file for a namespace, file versions and parameters """
+
+        key = (CACHE_VERSION, namespace, [file_key(fh, self.hash_contents) for fh in files], params)
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+
+        return os.path.join(self.cache_dir, f'{namespace}-{digest}.pkl')
+
+    def get(self, namespace: str, files: Iterable[str], params: Tuple = ()) -> Tuple[bool, Any]:
+        """ Look up a result, returns (hit, value), a miss if an input file cannot be read """
+
+        try:
+            path = self._path(namespace, files, params)
+            with open(path, 'rb') as handle:
+                value = pickle.load(handle)
+        except OSError:
+            return False, None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError):
+            # truncated, or pickled from classes that have since moved or changed
+            self._remove(path)
+            return False, None
+
+        with self._lock:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+
+        return True, value
+
+    def put(self, namespace: str, files: Iterable[str], value: Any, params: Tuple = ()) -> None:
+        """ Store a result and evict least recently used entries """
+
+        try:
+            path = self._path(namespace, files, params)
+        except OSError:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = tempfile.NamedTemporaryFile(dir=self.cache_dir, delete=False)
+
+        # pickle straight to disk, giving up as soon as the result outgrows the cache or cannot be pickled
+        try:
+            with tmp:
+                pickle.dump(value, _BoundedWriter(tmp, self.max_bytes), protocol=pickle.HIGHEST_PROTOCOL)
+        except (_CacheFull, pickle.PicklingError, AttributeError, TypeError):
+            self._remove(tmp.name)
+            return
+        except BaseException:
+            self._remove(tmp.name)
+            raise
+
+        with self._lock:
+            os.replace(tmp.name, path)
+            self._evict()
+
+    def cached(self, namespace: str, files: List[str], func: Callable, *args,
+               params: Tuple = (), **kwargs) -> Any:
+        """ Return the cached result or compute and store func(*args, **kwargs) """
+
+        hit, value = self.get(namespace, files, params)
+
+        if not hit:
+            value = func(*args, **kwargs)
+            self.put(namespace, files, value, params)
+
+        return value
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """ (last use, size, path) of all cache files """
+
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(self.cache_dir, name)))
+
+        return entries
+
+    def _evict(self) -> None:
+        """ Remove least recently used entries until the cache fits max_bytes, caller holds the lock """
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path: str) -> None:
+        """ Delete a cache file that may already be gone """
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        """ Remove all cached results """
+
+        with self._lock:
+            for _, _, path in self._entries():
+                self._remove(path)
+
+
+# --------------------------------------------------
+def test_result_cache(tmp_path) -> None:
+    """ Test ResultCache """
+
+    fasta = tmp_path / 'seqs.fa'
+    fasta.write_text('>seq1\nACGT\n')
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=10**6)
+    calls = []
+
+    def compute(x):
+        calls.append(x)
+        return x * 2
+
+    assert cache.get('double', [str(fasta)]) == (False, None)
+    assert cache.cached('double', [str(fasta)], compute, 2, params=(2,)) == 4
+    assert cache.cached('double', [str(fasta)], compute, 2, params=(2,)) == 4
+    assert calls == [2]
+
+    fasta.write_text('>seq1\nACGTACGT\n')
+    assert cache.cached('double', [str(fasta)], compute, 2, params=(2,)) == 4
+    assert calls == [2, 2]
+
+    small = ResultCache(str(tmp_path / 'small'), max_bytes=200)
+    small.put('first', [], 'A' * 100)
+    os.utime(small._path('first', [], ()), (0, 0))
+    small.put('second', [], 'B' * 100)
+    assert small.get('first', [])[0] is False
+    assert small.get('second', []) == (True, 'B' * 100)
+
+    small.put('large', [], 'C' * 1000)
+    assert small.get('large', [])[0] is False
+    assert [name for name in os.listdir(small.cache_dir) if not name.endswith('.pkl')] == []
+
+    # unreadable entries are misses and get removed
+    broken = cache._path('broken', [], ())
+    with open(broken, 'wb') as handle:
+        handle.write(pickle.dumps(ResultCache).replace(b'ResultCache', b'RenamedCach'))
+    assert cache.get('broken', []) == (False, None)
+    assert not os.path.exists(broken)
+
+    # missing inputs are misses, results that cannot be pickled are not stored and leave no temporary file
+    missing = str(tmp_path / 'missing.fa')
+    assert cache.get('double', [missing]) == (False, None)
+    cache.put('double', [missing], 4)
+    cache.put('lambda', [], lambda: None)
+    assert cache.get('lambda', []) == (False, None)
+    assert [name for name in os.listdir(cache.cache_dir) if not name.endswith('.pkl')] == []
+
+
+# --------------------------------------------------
+def test_result_cache_threads(tmp_path) -> None:
+    """ Test concurrent puts and gets while entries are evicted """
+
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=2000)
+
+    def work(i):
+        for j in range(30):
+            cache.put(f'n{i}', [], str(j) * 300, params=(j,))
+            cache.get(f'n{(i + 1) % 4}', [], params=(j,))
+        return True
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert all(executor.map(work, range(4)))
+    assert sum(size for _, size, _ in cache._entries()) <= 2000
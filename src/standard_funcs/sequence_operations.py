@@ -4,90 +4,88 @@ Date   : 2024-05-27
 Purpose: Functions for manipulating DNA sequences
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple, Union
+from collections import Counter
+from functools import lru_cache
+import heapq
 import re
-import sys
 from itertools import zip_longest
-import pandas as pd
-from Bio import Seq
+import numpy as np
+from .packed_seq import PackedSeq
+from .kernels import DNA_BASES, RNA_BASES, NA_BASES, has_only, transcribe_bytes, revc_bytes, count_bytes, gc_count_bytes
+from .profile_matrix import get_profile
+from .graph import list_overlaps
+from .translation import translate_frames
+from .fastx_handling import iter_records
+from .permutations import iter_perms
+
+_IUPAC_COMPLEMENT = str.maketrans('ACGTMRWSYKVHDBNacgtmrwsykvhdbn', 'TGCAKYWSRMBDHVNtgcakywsrmbdhvn')
 
 
 # --------------------------------------------------
 def is_DNA(sequence: str) -> bool:
     """ Checks if string is DNA """
 
-    for base in sequence.upper():
-        if base not in ['A', 'T', 'C', 'G']:
-            return False
-
-    return True
+    return has_only(sequence.encode(), DNA_BASES)
 
 
 # --------------------------------------------------
 def is_RNA(sequence: str) -> bool:
     """ Checks if string is RNA """
 
-    for base in sequence.upper():
-        if base not in ['A', 'U', 'C', 'G']:
-            return False
-
-    return True
+    return has_only(sequence.encode(), RNA_BASES)
 
 
 # --------------------------------------------------
 def is_NA(sequence: str) -> bool:
     """" Checks if string is DNA or RNA"""
 
-    for base in sequence.upper():
-        if base not in ['A', 'T', 'U', 'C', 'G']:
-            return False
-
-    return True
+    return has_only(sequence.encode(), NA_BASES)
 
 # --------------------------------------------------
-def count_bases(sequence: str) -> Dict[str, int]:
+def count_bases(sequence: Union[str, PackedSeq]) -> Dict[str, int]:
     """ Count bases in string """
 
-    counter = {}
+    if isinstance(sequence, PackedSeq):
+        return sequence.count_bases()
+
+    if not sequence.isascii():
+        return dict(Counter(base.upper() for base in sequence))
 
-    for base in sequence:
-        if base.upper() in counter.keys():
-            counter[base.upper()]+=1
-        else:
-            counter[base.upper()]=1
+    counts = count_bytes(sequence.upper().encode('ascii'))
 
-    return counter
+    return {chr(base): int(counts[base]) for base in np.flatnonzero(counts)}
 
 
 # --------------------------------------------------
 def transcribe(seq: str) -> str:
     """ Transcribe DNA to RNA """
 
-    return re.sub('t', 'u', re.sub('T', 'U', seq))
+    return transcribe_bytes(seq.encode()).decode()
 
 
 # --------------------------------------------------
-def get_revc(seq: str) -> str:
+def get_revc(seq: Union[str, PackedSeq]) -> Union[str, PackedSeq]:
     """ Reverse complement to a sequence """
 
-    revc = ''
-    trans = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G',
-             'a': 't', 't': 'a', 'g': 'c', 'c': 'g'}
+    if isinstance(seq, PackedSeq):
+        return seq.reverse_complement()
 
-    for base in seq[::-1]:
-        if base not in trans.keys():
-            sys.exit(f'Found "{base}" in sequence. Please enter a valid DNA sequence.')
-        else:
-            revc+=trans[base]
+    if not seq.isascii():
+        base = next(base for base in reversed(seq) if not base.isascii())
+        raise ValueError(f'Found "{base}" in sequence. Please enter a valid DNA sequence.')
 
-    return revc
+    return revc_bytes(seq.encode('ascii')).decode()
 
 
 # --------------------------------------------------
-def get_gc(sequence: str) -> float:
+def get_gc(sequence: Union[str, PackedSeq]) -> float:
     """ Get GC content of a sequence """
 
-    gc_count = sequence.upper().count('G') + sequence.upper().count('C')
+    if isinstance(sequence, PackedSeq):
+        gc_count = sequence.gc_count()
+    else:
+        gc_count = gc_count_bytes(sequence.encode())
 
     if gc_count == 0:
         return 0
@@ -106,43 +104,19 @@ def get_hamming(seq1: str, seq2: str) -> int:
 def translate(sequence: str, stop=False, shift=0) -> str:
     """ Translates an RNA or DNA sequence """
 
-    sequence = sequence.upper()
-
-    if sequence.find('T'):
-        sequence = re.sub('t', 'u', re.sub('T', 'U', sequence))
-
-    codon_table = {
-        "UUU" : "F", "CUU" : "L", "AUU" : "I", "GUU" : "V",
-        "UUC" : "F", "CUC" : "L", "AUC" : "I", "GUC" : "V",
-        "UUA" : "L", "CUA" : "L", "AUA" : "I", "GUA" : "V",
-        "UUG" : "L", "CUG" : "L", "AUG" : "M", "GUG" : "V",
-        "UCU" : "S", "CCU" : "P", "ACU" : "T", "GCU" : "A",
-        "UCC" : "S", "CCC" : "P", "ACC" : "T", "GCC" : "A",
-        "UCA" : "S", "CCA" : "P", "ACA" : "T", "GCA" : "A",
-        "UCG" : "S", "CCG" : "P", "ACG" : "T", "GCG" : "A",
-        "UAU" : "Y", "CAU" : "H", "AAU" : "N", "GAU" : "D",
-        "UAC" : "Y", "CAC" : "H", "AAC" : "N", "GAC" : "D",
-        "UAA" : "*", "CAA" : "Q", "AAA" : "K", "GAA" : "E",
-        "UAG" : "*", "CAG" : "Q", "AAG" : "K", "GAG" : "E",
-        "UGU" : "C", "CGU" : "R", "AGU" : "S", "GGU" : "G",
-        "UGC" : "C", "CGC" : "R", "AGC" : "S", "GGC" : "G",
-        "UGA" : "*", "CGA" : "R", "AGA" : "R", "GGA" : "G",
-        "UGG" : "W", "CGG" : "R", "AGG" : "R", "GGG" : "G"
-    }
-
-    codons = [sequence[i:i+3] for i in range(shift, len(sequence), 3) if len(sequence[i:i+3])==3]
-
-    aas = [codon_table.get(codon) for codon in codons]
+    aas = translate_frames(str(sequence), [shift + 1])[shift + 1]
 
     if '*' in aas and stop:
-        return ''.join(aas[:aas.index('*')])
+        return aas[:aas.index('*')]
 
-    return ''.join(aas)
+    return aas
 
 
 # --------------------------------------------------
-def get_kmers(sequence: str, k: int) -> List[str]:
-    """ Get all k-mers in sequence """
+def get_kmers(sequence: Union[str, PackedSeq], k: int) -> List[str]:
+    """ Get all k-mers in sequence, see kmers for streaming codes and counts """
+
+    sequence = str(sequence)
 
     return [sequence[i:i+k] for i in range(len(sequence)-k+1)]
 
@@ -153,46 +127,33 @@ def find_motifs(sequence, motif):
 
     if motif == '':
         return []
-    return [index for index, kmer in enumerate(get_kmers(sequence, len(motif))) if kmer==motif]
+
+    sequence = str(sequence)
+    positions = []
+    index = sequence.find(motif)
+
+    while index != -1:
+        positions.append(index)
+        index = sequence.find(motif, index + 1)
+
+    return positions
 
 
 # --------------------------------------------------
 def get_consensus(seqs: List[str]) -> str:
     """ Get the consensus sequence """
 
-    seqs_list = []
-
     if not seqs or not seqs[0]:
         return ''
 
-    for seq in seqs:
-        bases = [base for index, base in enumerate(seq.upper())]
-        seqs_list.append(bases)
-
-    seqs_df = pd.DataFrame(seqs_list)
-
-    profile_matrix = seqs_df.apply(lambda x: x.value_counts()).fillna(0).astype(int)
-
-    profile_matrix = profile_matrix.apply(lambda x: x.idxmax())
-
-    return ''.join(profile_matrix.to_string(header=False, index=False).split('\n'))
+    return get_profile(seqs, upper=True).consensus
 
 
 # --------------------------------------------------
 def get_graphs(sequences: Dict[str, str], overlap: int) -> List[Tuple[str, str]]:
     """ Make graphs """
 
-    graphs = list(tuple())
-
-    seqs = [(id, sequences[id][0:overlap], sequences[id][-overlap:])
-            for id in sequences]
-
-    for i in range(len(seqs)):
-        for j in range(len(seqs)):
-            if i!= j and seqs[i][2] == seqs[j][1]:
-                graphs.append((seqs[i][0], seqs[j][0]))
-
-    return graphs
+    return list_overlaps(sequences, overlap)
 
 
 # --------------------------------------------------
@@ -205,41 +166,90 @@ def generate_perms(permutable):
     if not type(permutable) == str:
         permutable = str(permutable) 
 
-    if len(permutable) <= 1:
-        yield permutable 
-        return
+    for perm in iter_perms(permutable):
+        yield ''.join(perm)
+
 
-    for i in range(len(permutable)):
-        for perm in generate_perms(''.join([permutable[i+1:], permutable[:i]])):
-            yield permutable[i] + perm
+# --------------------------------------------------
+def iter_palis(seq: Union[str, PackedSeq], low=4, high=12, block_size=1 << 16) -> Iterator[Tuple[int, int]]:
+    """ Yield (index, length) of all reverse complement palindromes in position order """
+
+    max_reach = high // 2
+    pending = []
+
+    # centres are scanned block by block, expanding at most max_reach bases into the context around the block
+    for block_start in range(0, len(seq), block_size):
+        context_start = max(block_start - max_reach, 0)
+        text = str(seq[context_start:block_start + block_size + max_reach])
+        comp = text.translate(_IUPAC_COMPLEMENT)
+
+        for i in range(block_start - context_start, min(block_start + block_size, len(seq)) - context_start):
+            # even radii are centred between i-1 and i
+            k = 0
+            while k < max_reach and i + k < len(text) and i - k - 1 >= 0 and comp[i+k] == text[i-k-1]:
+                k += 1
+            for half in range((low + 1) // 2, k + 1):
+                heapq.heappush(pending, (context_start + i - half, 2 * half))
+
+            # odd ones on self-complementary bases like N
+            if comp[i] == text[i]:
+                k = 1
+                while k <= (high - 1) // 2 and i + k < len(text) and i - k >= 0 and comp[i+k] == text[i-k]:
+                    k += 1
+                for half in range(max(low // 2, 0), k):
+                    heapq.heappush(pending, (context_start + i - half, 2 * half + 1))
+
+            # later centres can only report sites starting after i - max_reach
+            while pending and pending[0][0] <= context_start + i - max_reach:
+                yield heapq.heappop(pending)
+
+    while pending:
+        yield heapq.heappop(pending)
 
 
 # --------------------------------------------------
-def locate_palis(seq: str, low=4, high=12) -> List[Tuple[int, int]]:
+def locate_palis(seq: Union[str, PackedSeq], low=4, high=12) -> List[Tuple[int, int]]:
     """ Takes a sequence and returns length and INDEX of all palindromes """
 
-    pali_positions = []
+    return list(iter_palis(seq, low, high))
 
-    for k in range(low, high+1):
-        position = 0
-        for i in get_kmers(seq, k):
-            if Seq.reverse_complement(i) == i:
-                pali_positions.append((position, k))
-            position += 1
 
-    return sorted(pali_positions, key=lambda x: x[0])
+# --------------------------------------------------
+def scan_palis(files: List[str], low=4, high=12) -> Iterator[Tuple[str, int, int]]:
+    """ Yield (id, index, length) of palindromes in all records of fastx files """
+
+    for rec in iter_records(files):
+        for position, length in iter_palis(rec.seq, low, high):
+            yield rec.id, position, length
 
 
 # --------------------------------------------------
-def get_spliced(sequence: str, introns: list) -> str:
+@lru_cache(maxsize=32)
+def _intron_pattern(introns: Tuple[str, ...], ignore_case: bool) -> re.Pattern:
+    """ One alternation of all introns, longest first so the longest match wins """
+
+    alternatives = sorted(dict.fromkeys(intron for intron in introns if intron), key=len, reverse=True)
+
+    return re.compile('|'.join(re.escape(intron) for intron in alternatives),
+                      re.IGNORECASE if ignore_case else 0)
+
+
+# --------------------------------------------------
+def get_spliced(sequence: str, introns: list, ignore_case=False) -> str:
     """ Get spliced sequence """
 
-    spliced = sequence
+    if not any(introns):
+        return sequence
 
-    for _, intron in enumerate(introns):
-        spliced = re.sub(intron, '', spliced, re.IGNORECASE)
+    return ''.join(_intron_pattern(tuple(introns), ignore_case).split(sequence))
 
-    return spliced
+
+# --------------------------------------------------
+def splice_records(files: List[str], introns: list, ignore_case=False) -> Iterator[Tuple[str, str]]:
+    """ Yield (id, spliced sequence) for all records of fastx files """
+
+    for rec in iter_records(files):
+        yield rec.id, get_spliced(rec.seq, introns, ignore_case)
 
 
 # --------------------------------------------------
@@ -260,6 +270,7 @@ def test_is_xNA() -> None:
     assert is_NA('') == True
     assert is_NA('CGACGGACUUAGU') == True
     assert is_NA('CGACGAATACCCG') == True
+    assert is_NA('ACG§') == False
 
 
 # --------------------------------------------------
@@ -273,6 +284,8 @@ def test_count_bases() -> None:
     assert count_bases('ABCaBC') == {'A': 2, 'B': 2, 'C': 2}
     assert count_bases('ABCDEFG') == {'A':1, 'B': 1, 'C': 1, 'D': 1, 'E': 1, 'F': 1, 'G': 1}
     assert count_bases('AABbbCAA') == {'A': 4, 'B': 3, 'C': 1}
+    assert count_bases('a§A') == {'A': 2, '§': 1}
+    assert count_bases(PackedSeq('AAcgNTA')) == {'A': 3, 'C': 1, 'G': 1, 'N': 1, 'T': 1}
 
 
 # --------------------------------------------------
@@ -298,6 +311,13 @@ def test_get_revc() -> None:
     assert get_revc('atTgC') == 'GcAat'
     assert get_revc('AttA') == 'TaaT'
     assert get_revc('aTTa') == 'tAAt'
+    assert get_revc(PackedSeq('ACTG')) == 'CAGT'
+
+    try:
+        get_revc('ACUG')
+        assert False
+    except ValueError as err:
+        assert str(err) == 'Found "U" in sequence. Please enter a valid DNA sequence.'
 
 
 # --------------------------------------------------
@@ -310,6 +330,7 @@ def test_get_gc() -> None:
     assert get_gc('AATT') == 0
     assert get_gc('actg') == 50
     assert get_gc('AaTtcGgTATTa') == 25
+    assert get_gc(PackedSeq('AaTtcGgTATTa')) == 25
 
 
 # --------------------------------------------------
@@ -332,6 +353,7 @@ def test_translate() -> None:
     assert(translate('ACCUGACGG', stop=True)) == 'T'
     assert(translate('ACCUGACGGGC')) == 'T*R'
     assert(translate('AACCUGACGGGC', shift=1)) == 'T*R'
+    assert(translate('aacNNN')) == 'NX'
 
 
 # --------------------------------------------------
@@ -361,6 +383,8 @@ def test_find_motifs() -> None:
     assert find_motifs('ABCDEFGABC', 'ABC') == [0, 7]
     assert find_motifs('ABCDEFGABC', 'ZZ') == []
     assert find_motifs('', 'ABCDEFG') == []
+    assert find_motifs(PackedSeq('ACGTTACGT'), 'ACG') == [0, 5]
+    assert find_motifs('AAAA', 'AA') == [0, 1, 2]
 
 
 # --------------------------------------------------
@@ -371,7 +395,7 @@ def test_generate_perms() -> None:
     assert list(generate_perms('12')) == ['12', '21']
     assert list(generate_perms('AB')) == ['AB', 'BA']
     assert list(generate_perms(15)) == ['15', '51']
-    assert list(generate_perms([1, 2, 'A'])) == ['12A', '1A2', '2A1', '21A', 'A12', 'A21']
+    assert list(generate_perms([1, 2, 'A'])) == ['12A', '1A2', '21A', '2A1', 'A12', 'A21']
 
 
 # --------------------------------------------------
@@ -382,6 +406,23 @@ def test_locate_palis() -> None:
     assert locate_palis('CATATCAATATGACAGT') == [(1, 4), (7, 4)]
     assert locate_palis('CTCAATGCATGCGGGTCTATATGCAT') == [(4, 6), (5, 4), (6, 6), (7, 4),
                                                          (17, 4), (18, 4), (20, 6), (21, 4)]
+    assert locate_palis('ATATATAT', 4, 6) == [(0, 4), (0, 6), (1, 4), (1, 6), (2, 4), (2, 6), (3, 4), (4, 4)]
+    assert locate_palis('GAATTCaatt') == [(0, 6), (1, 4), (6, 4)]
+    assert list(iter_palis('ANNT')) == [(0, 4)]
+    assert list(iter_palis('ANT', 3)) == [(0, 3)]
+
+    seq = 'CTCAATGCATGCGGGTCTATATGCAT' * 3
+    assert list(iter_palis(PackedSeq(seq), block_size=5)) == locate_palis(seq)
+
+
+# --------------------------------------------------
+def test_scan_palis(tmp_path) -> None:
+    """ Test scan_palis """
+
+    fasta = tmp_path / 'seqs.fa'
+    fasta.write_text('>seq1\nCATATCAATATGACAGT\n>seq2\nGAATTC\n')
+
+    assert list(scan_palis([str(fasta)])) == [('seq1', 1, 4), ('seq1', 7, 4), ('seq2', 0, 6), ('seq2', 1, 4)]
 
 
 # --------------------------------------------------
@@ -391,3 +432,19 @@ def test_get_spliced() -> None:
     assert get_spliced('ABCDEFGAAAHIJKLMBBBBBBNOP', ['AAA', 'BBBBBB']) == 'ABCDEFGHIJKLMNOP'
     assert get_spliced('ABC', []) == 'ABC'
     assert get_spliced('', ['ABC', 'BCD']) == ''
+    assert get_spliced('AAXAAXAAXAAXB', ['AAX']) == 'B'
+    assert get_spliced('A.CA+B', ['.', '+']) == 'ACAB'
+    assert get_spliced('ABCDabcd', ['BC', 'B', '']) == 'ADabcd'
+    assert get_spliced('ABCDabcd', ['bc'], ignore_case=True) == 'ADad'
+
+
+# --------------------------------------------------
+def test_splice_records(tmp_path) -> None:
+    """ Test splice_records """
+
+    fasta = tmp_path / 'transcripts.fa'
+    fasta.write_text('>t1\nATGGTCTACATAGCTGACAAACAGCACGTAGCAATCGGTCGAATCTCGAGAGGCATATGGTCACATGATCGGTCGAGCGTGTTTCAAAGTTTGCGCCTAG\n'
+                     '>t2\nATCGGTCGAA\n')
+
+    assert list(splice_records([str(fasta)], ['ATCGGTCGAA', 'ATCGGTCGAGCGTGT'])) == [
+        ('t1', 'ATGGTCTACATAGCTGACAAACAGCACGTAGCATCTCGAGAGGCATATGGTCACATGTTCAAAGTTTGCGCCTAG'), ('t2', '')]
@@ -0,0 +1,197 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Shared substrings of many sequences with a generalized suffix array
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Optional
+from collections import deque
+import numpy as np
+from .sequence_operations import find_motifs
+
+Progress = Optional[Callable[[int, int], None]]
+
+# loop iterations between progress reports
+PROGRESS_STEP = 1 << 16
+
+
+# --------------------------------------------------
+class SharedSubstring(NamedTuple):
+    """ Substring shared by all sequences and its start positions in each """
+
+    substring: str
+    positions: Dict[str, List[int]]
+
+
+# --------------------------------------------------
+def suffix_array(text: np.ndarray) -> np.ndarray:
+    """ Suffix array of an integer array by prefix doubling """
+
+    n = len(text)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    rank = np.unique(text, return_inverse=True)[1].astype(np.int64)
+    suffixes = np.argsort(rank, kind='stable')
+    k = 1
+
+    while k < n:
+        second = np.full(n, -1, dtype=np.int64)
+        second[:n-k] = rank[k:]
+        suffixes = np.lexsort((second, rank))
+
+        changed = (np.diff(rank[suffixes]) != 0) | (np.diff(second[suffixes]) != 0)
+        rank = np.empty(n, dtype=np.int64)
+        rank[suffixes] = np.concatenate(([0], np.cumsum(changed)))
+
+        if rank.max() == n - 1:
+            break
+        k *= 2
+
+    return suffixes
+
+
+# --------------------------------------------------
+def lcp_array(text: List[int], suffixes: List[int], progress: Progress = None) -> List[int]:
+    """ Kasai's algorithm, lcp[i] is the common prefix length of suffixes i-1 and i """
+
+    n = len(text)
+    rank = [0] * n
+    for i, suffix in enumerate(suffixes):
+        rank[suffix] = i
+
+    lcp = [0] * n
+    h = 0
+
+    for i in range(n):
+        if progress and i % PROGRESS_STEP == 0:
+            progress(i, n)
+        if rank[i] > 0:
+            j = suffixes[rank[i] - 1]
+            while i + h < n and j + h < n and text[i+h] == text[j+h]:
+                h += 1
+            lcp[rank[i]] = h
+            if h:
+                h -= 1
+        else:
+            h = 0
+
+    return lcp
+
+
+# --------------------------------------------------
+def shared_substrings(sequences: Dict[str, str], top: int = 1, progress: Progress = None) -> List[SharedSubstring]:
+    """ Longest substrings shared by all sequences, longest first """
+
+    seqs = list(sequences.values())
+
+    if not seqs or not all(seqs):
+        return []
+
+    if len(seqs) == 1:
+        candidates = [seqs[0]]
+    else:
+        candidates = _common_candidates(seqs, top, progress)
+
+    return [SharedSubstring(sub, {seq_id: find_motifs(sequences[seq_id], sub) for seq_id in sequences})
+            for sub in candidates]
+
+
+# --------------------------------------------------
+def _common_candidates(seqs: List[str], top: int, progress: Progress = None) -> List[str]:
+    """ Slide a window over the suffix array until it holds suffixes of every sequence """
+
+    num_seqs = len(seqs)
+
+    # unique separators below all symbols keep common prefixes inside one sequence
+    parts, colours = [], []
+    for index, seq in enumerate(seqs):
+        parts.append(np.frombuffer(seq.encode('ascii'), dtype=np.uint8).astype(np.int64) + num_seqs)
+        parts.append(np.array([index], dtype=np.int64))
+        colours.append(np.full(len(seq) + 1, index, dtype=np.int64))
+
+    text = np.concatenate(parts)
+    colour = np.concatenate(colours).tolist()
+    suffixes = suffix_array(text).tolist()
+    lcp = lcp_array(text.tolist(), suffixes, (lambda done, total: progress(done, 2 * total)) if progress else None)
+
+    windows = []
+    counts = [0] * num_seqs
+    covered = 0
+    minima = deque()
+    left = num_seqs
+
+    # the separators sort first, windows start behind them
+    for right in range(num_seqs, len(suffixes)):
+        if progress and right % PROGRESS_STEP == 0:
+            progress(len(suffixes) + right, 2 * len(suffixes))
+        col = colour[suffixes[right]]
+        counts[col] += 1
+        covered += counts[col] == 1
+
+        if right > left:
+            while minima and lcp[minima[-1]] >= lcp[right]:
+                minima.pop()
+            minima.append(right)
+
+        while covered == num_seqs:
+            if minima and lcp[minima[0]]:
+                windows.append((lcp[minima[0]], suffixes[left]))
+            col = colour[suffixes[left]]
+            counts[col] -= 1
+            covered -= counts[col] == 0
+            left += 1
+            while minima and minima[0] <= left:
+                minima.popleft()
+
+    windows.sort(key=lambda x: -x[0])
+    concatenated = text.tolist()
+    selected = []
+
+    for length, start in windows:
+        sub = bytes(x - num_seqs for x in concatenated[start:start+length]).decode()
+        if not any(sub in chosen for chosen in selected):
+            selected.append(sub)
+            if len(selected) == top:
+                break
+
+    return selected
+
+
+# --------------------------------------------------
+def longest_common_substring(seqs: List[str]) -> str:
+    """ Longest substring shared by all sequences """
+
+    shared = shared_substrings(dict(enumerate(seqs)))
+
+    return shared[0].substring if shared else ''
+
+
+# --------------------------------------------------
+def test_suffix_array() -> None:
+    """ Test suffix_array and lcp_array """
+
+    text = np.frombuffer(b'banana', dtype=np.uint8)
+    suffixes = suffix_array(text).tolist()
+
+    assert suffixes == [5, 3, 1, 0, 4, 2]
+    assert lcp_array(text.tolist(), suffixes) == [0, 1, 3, 0, 0, 2]
+    assert suffix_array(np.zeros(0, dtype=np.uint8)).tolist() == []
+
+
+# --------------------------------------------------
+def test_shared_substrings() -> None:
+    """ Test longest_common_substring and shared_substrings """
+
+    assert longest_common_substring(['GATTACA', 'TAGACCA', 'ATACA']) in ('TA', 'AC', 'CA')
+    assert longest_common_substring(['ACGTACGT', 'TTACGTAA', 'GGACGTAC']) == 'ACGTA'
+    assert longest_common_substring(['ACGT']) == 'ACGT'
+    assert longest_common_substring(['AAA', 'CCC']) == ''
+    assert longest_common_substring([]) == ''
+
+    shared = shared_substrings({'a': 'ACGTTTGG', 'b': 'TTGGACG'}, top=2)
+    assert shared == [('TTGG', {'a': [4], 'b': [0]}), ('ACG', {'a': [0], 'b': [4]})]
+
+    steps = []
+    shared_substrings({'a': 'ACGTTTGG', 'b': 'TTGGACG'}, progress=lambda done, total: steps.append((done, total)))
+    assert steps and steps == sorted(steps) and all(done < total for done, total in steps)
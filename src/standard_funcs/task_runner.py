@@ -0,0 +1,262 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Background task runner for the GUI with progress, cancellation and duplicate prevention
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+import queue
+import threading
+
+
+# --------------------------------------------------
+class TaskCancelled(Exception):
+    """ Raised inside a task when it has been cancelled """
+
+
+# --------------------------------------------------
+class Task:
+    """ Handle of one submitted job, progress is queued by the worker and read by the runner """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.future: Optional[Future] = None
+        self._cancel_event = threading.Event()
+        self._progress: queue.SimpleQueue = queue.SimpleQueue()
+        self._output: queue.SimpleQueue = queue.SimpleQueue()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        """ Ask the job to stop, it does at its next progress report """
+
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def report(self, done: int, total: int = 0) -> None:
+        """ Progress callback for the worker, raises TaskCancelled once the task is cancelled """
+
+        if self._cancel_event.is_set():
+            raise TaskCancelled(self.key)
+
+        self._progress.put((done, total))
+
+    def emit(self, part: Any) -> None:
+        """ Output callback for the worker, parts are handed to the GUI thread on the next poll """
+
+        self._output.put(part)
+
+    def drain_output(self) -> List[Any]:
+        """ All queued output parts in order """
+
+        parts = []
+        while True:
+            try:
+                parts.append(self._output.get_nowait())
+            except queue.Empty:
+                return parts
+
+    def drain(self) -> Optional[Tuple[int, int]]:
+        """ Latest queued progress, if any """
+
+        latest = None
+        while True:
+            try:
+                latest = self._progress.get_nowait()
+            except queue.Empty:
+                return latest
+
+
+# --------------------------------------------------
+class TaskRunner:
+    """ Run jobs in a thread pool, delivering progress and results on the GUI thread through after() """
+
+    def __init__(self, after: Callable[[int, Callable], Any], workers: Optional[int] = 2, poll_ms: int = 50):
+        self._after = after
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._poll_ms = poll_ms
+        self._tasks: Dict[str, Tuple[Task, Dict[str, Optional[Callable]]]] = {}
+        self._polling = False
+
+    def submit(self, key: str, func: Callable, *args, on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               on_progress: Optional[Callable[[int, int], None]] = None,
+               on_cancel: Optional[Callable[[], None]] = None,
+               on_output: Optional[Callable[[List[Any]], None]] = None, **kwargs) -> Optional[Task]:
+        """ Run func(*args, progress=task.report, **kwargs), returns None if a job with key is still running """
+
+        if key in self._tasks:
+            return None
+
+        task = Task(key)
+        # with on_output the job also gets emit=task.emit, emitted parts are delivered while it is running
+        if on_output is not None:
+            kwargs['emit'] = task.emit
+        task.future = self._executor.submit(func, *args, progress=task.report, **kwargs)
+        self._tasks[key] = (task, {'done': on_done, 'error': on_error, 'progress': on_progress, 'cancel': on_cancel,
+                                   'output': on_output})
+
+        if not self._polling:
+            self._polling = True
+            self._after(self._poll_ms, self._poll)
+
+        return task
+
+    def running(self, key: Optional[str] = None) -> bool:
+        """ Whether the job with key, or any job, is running """
+
+        return key in self._tasks if key is not None else bool(self._tasks)
+
+    def cancel(self, keys: Optional[Iterable[str]] = None) -> None:
+        """ Cancel the given jobs, or all of them """
+
+        for key in list(self._tasks) if keys is None else keys:
+            if key in self._tasks:
+                self._tasks[key][0].cancel()
+
+    def shutdown(self) -> None:
+        """ Cancel everything and stop the pool without waiting, running jobs end at their next progress report """
+
+        # the workers are not daemon threads, the interpreter still waits for running jobs on exit, so a step
+        # without progress reports in between (e.g. a Graphviz render) finishes before the process ends
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self) -> None:
+        """ Deliver progress and finished results, reschedules itself while jobs are running """
+
+        for key, (task, callbacks) in list(self._tasks.items()):
+            latest = task.drain()
+            if latest is not None and callbacks['progress'] and not task.cancelled:
+                callbacks['progress'](*latest)
+
+            parts = task.drain_output()
+            if parts and callbacks['output'] and not task.cancelled:
+                callbacks['output'](parts)
+
+            if not task.future.done():
+                continue
+
+            del self._tasks[key]
+            try:
+                result = task.future.result()
+            except (TaskCancelled, CancelledError):
+                if callbacks['cancel']:
+                    callbacks['cancel']()
+            except Exception as err:
+                if callbacks['error']:
+                    callbacks['error'](err)
+            else:
+                if task.cancelled:
+                    if callbacks['cancel']:
+                        callbacks['cancel']()
+                elif callbacks['done']:
+                    callbacks['done'](result)
+
+        self._polling = bool(self._tasks)
+        if self._polling:
+            self._after(self._poll_ms, self._poll)
+
+
+# --------------------------------------------------
+class _ManualScheduler:
+    """ Stand-in for widget.after in tests, runs scheduled callbacks on request """
+
+    def __init__(self):
+        self.pending = []
+
+    def __call__(self, delay: int, callback: Callable) -> None:
+        self.pending.append(callback)
+
+    def run_until_idle(self, runner: TaskRunner) -> None:
+        while self.pending:
+            if runner.running():
+                threading.Event().wait(0.01)
+            self.pending.pop(0)()
+
+
+# --------------------------------------------------
+def test_task_runner() -> None:
+    """ Test TaskRunner results, errors and duplicate prevention """
+
+    scheduler = _ManualScheduler()
+    runner = TaskRunner(scheduler)
+    release = threading.Event()
+    results, errors, steps = [], [], []
+
+    def job(value, progress):
+        release.wait(5)
+        for step in range(3):
+            progress(step + 1, 3)
+        return value * 2
+
+    assert runner.submit('job', job, 21, on_done=results.append, on_progress=lambda done, total: steps.append(done))
+    assert runner.submit('job', job, 1) is None
+    assert runner.running('job')
+    release.set()
+
+    runner.submit('fail', lambda progress: 1 / 0, on_error=errors.append)
+    scheduler.run_until_idle(runner)
+
+    assert results == [42]
+    assert steps and steps[-1] == 3
+    assert len(errors) == 1 and isinstance(errors[0], ZeroDivisionError)
+    assert not runner.running()
+    assert runner.submit('job', job, 1, on_done=results.append)
+    scheduler.run_until_idle(runner)
+    assert results == [42, 2]
+    runner.shutdown()
+
+
+# --------------------------------------------------
+def test_task_runner_output() -> None:
+    """ Test streaming output parts from a running job """
+
+    scheduler = _ManualScheduler()
+    runner = TaskRunner(scheduler)
+    received, results = [], []
+
+    def job(count, progress, emit):
+        for part in range(count):
+            emit(part)
+        return 'done'
+
+    runner.submit('stream', job, 5, on_output=received.append, on_done=results.append)
+    scheduler.run_until_idle(runner)
+
+    assert sum(received, []) == list(range(5))
+    assert results == ['done']
+    runner.shutdown()
+
+
+# --------------------------------------------------
+def test_task_runner_cancel() -> None:
+    """ Test cancelling a running job """
+
+    scheduler = _ManualScheduler()
+    runner = TaskRunner(scheduler, workers=1)
+    started = threading.Event()
+    outcome = []
+
+    def job(progress):
+        started.set()
+        step = 0
+        while True:
+            step += 1
+            progress(step)
+            threading.Event().wait(0.001)
+
+    runner.submit('loop', job, on_done=outcome.append, on_cancel=lambda: outcome.append('cancelled'))
+    queued = runner.submit('queued', job, on_cancel=lambda: outcome.append('queued cancelled'))
+    started.wait(5)
+    runner.cancel()
+    scheduler.run_until_idle(runner)
+
+    assert sorted(outcome) == ['cancelled', 'queued cancelled']
+    assert queued.cancelled
+    assert not runner.running()
+    runner.shutdown()
@@ -0,0 +1,174 @@
+"""
+Author : Tim Berneiser
+Date   : 2026-10-17
+Purpose: Vectorized six-frame translation with a codon lookup array
+"""
+
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+import numpy as np
+
+CODON_TABLE = {
+    "UUU" : "F", "CUU" : "L", "AUU" : "I", "GUU" : "V",
+    "UUC" : "F", "CUC" : "L", "AUC" : "I", "GUC" : "V",
+    "UUA" : "L", "CUA" : "L", "AUA" : "I", "GUA" : "V",
+    "UUG" : "L", "CUG" : "L", "AUG" : "M", "GUG" : "V",
+    "UCU" : "S", "CCU" : "P", "ACU" : "T", "GCU" : "A",
+    "UCC" : "S", "CCC" : "P", "ACC" : "T", "GCC" : "A",
+    "UCA" : "S", "CCA" : "P", "ACA" : "T", "GCA" : "A",
+    "UCG" : "S", "CCG" : "P", "ACG" : "T", "GCG" : "A",
+    "UAU" : "Y", "CAU" : "H", "AAU" : "N", "GAU" : "D",
+    "UAC" : "Y", "CAC" : "H", "AAC" : "N", "GAC" : "D",
+    "UAA" : "*", "CAA" : "Q", "AAA" : "K", "GAA" : "E",
+    "UAG" : "*", "CAG" : "Q", "AAG" : "K", "GAG" : "E",
+    "UGU" : "C", "CGU" : "R", "AGU" : "S", "GGU" : "G",
+    "UGC" : "C", "CGC" : "R", "AGC" : "S", "GGC" : "G",
+    "UGA" : "*", "CGA" : "R", "AGA" : "R", "GGA" : "G",
+    "UGG" : "W", "CGG" : "R", "AGG" : "R", "GGG" : "G"
+}
+
+FRAMES = (1, 2, 3, -1, -2, -3)
+
+# A, C, G, T/U as 0-3, anything else as 4
+_BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _bases in enumerate(('Aa', 'Cc', 'Gg', 'TtUu')):
+    for _base in _bases:
+        _BASE_CODES[ord(_base)] = _code
+
+_COMPLEMENT_CODES = np.array([3, 2, 1, 0, 4], dtype=np.uint8)
+
+# codon index 16*first + 4*second + third, index 64 for codons with unknown bases
+_CODON_LOOKUP = np.full(65, ord('X'), dtype=np.uint8)
+for _codon, _aa in CODON_TABLE.items():
+    _CODON_LOOKUP[sum(int(_BASE_CODES[ord(base)]) << shift for base, shift in zip(_codon, (4, 2, 0)))] = ord(_aa)
+
+
+# --------------------------------------------------
+def encode_bases(sequence: Union[str, bytes]) -> np.ndarray:
+    """ Encode nucleotides as 0-3 (ACGT/U), 4 for anything else """
+
+    if isinstance(sequence, str):
+        sequence = sequence.encode('ascii')
+
+    return _BASE_CODES[np.frombuffer(sequence, dtype=np.uint8)]
+
+
+# --------------------------------------------------
+def _translate_codons(first: np.ndarray, second: np.ndarray, third: np.ndarray) -> np.ndarray:
+    """ Amino acid bytes of codons given as uint8 base codes """
+
+    index = np.where((first | second | third) & 4, 64, (first << 4) | (second << 2) | third)
+
+    return _CODON_LOOKUP[index]
+
+
+# --------------------------------------------------
+def _translate_concat(codes: np.ndarray, lengths: np.ndarray, shift: int) -> List[np.ndarray]:
+    """ Translate concatenated encoded sequences at one shift, split per sequence """
+
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    num_codons = np.maximum((lengths - shift) // 3, 0)
+    ends = np.cumsum(num_codons)
+    dtype = np.int32 if len(codes) < 2**31 else np.int64
+
+    # position of codon c is 3*c plus a per sequence offset, the offsets are repeated once per codon
+    offsets = (starts + shift - 3 * (ends - num_codons)).astype(dtype)
+    positions = np.repeat(offsets, num_codons) + 3 * np.arange(int(num_codons.sum()), dtype=dtype)
+    proteins = _translate_codons(codes[positions], codes[positions + 1], codes[positions + 2])
+
+    return np.split(proteins, ends[:-1])
+
+
+# --------------------------------------------------
+def translate_codons(sequence: str, frame: int, first: int, last: int) -> np.ndarray:
+    """ Amino acid bytes of codons first to last of one frame, encoding only that part of the sequence """
+
+    offset = abs(frame) - 1
+
+    if frame > 0:
+        codes = encode_bases(sequence[offset + 3*first:offset + 3*last])
+    else:
+        end = len(sequence) - offset - 3*first
+        codes = _COMPLEMENT_CODES[encode_bases(sequence[end - 3*(last - first):end])[::-1]]
+
+    return _translate_codons(codes[0::3], codes[1::3], codes[2::3])
+
+
+# --------------------------------------------------
+def iter_frame_blocks(sequence: str, frame: int, block_codons: int = 1 << 20) -> Iterator[Tuple[int, np.ndarray]]:
+    """ (first codon, amino acid bytes) of one frame in blocks of block_codons, one block in memory at a time """
+
+    num_codons = max((len(sequence) - abs(frame) + 1) // 3, 0)
+
+    for first in range(0, num_codons, block_codons):
+        yield first, translate_codons(sequence, frame, first, min(first + block_codons, num_codons))
+
+
+# --------------------------------------------------
+def translate_batch(sequences: Iterable[str], frames: Iterable[int] = FRAMES,
+                    as_array: bool = False) -> List[Dict[int, Union[str, np.ndarray]]]:
+    """ Translate many sequences in the given frames at once (1 to 3 forward, -1 to -3 reverse strand) """
+
+    encoded = [encode_bases(str(seq)) for seq in sequences]
+
+    if not encoded:
+        return []
+
+    lengths = np.array([len(codes) for codes in encoded], dtype=np.int64)
+    forward = np.concatenate(encoded)
+    # reverse complementing the concatenation also reverses the order of the sequences
+    reverse = _COMPLEMENT_CODES[forward[::-1]]
+
+    results = [{} for _ in encoded]
+
+    for frame in frames:
+        if frame > 0:
+            proteins = _translate_concat(forward, lengths, frame - 1)
+        else:
+            proteins = _translate_concat(reverse, lengths[::-1], -frame - 1)[::-1]
+
+        for result, protein in zip(results, proteins):
+            result[frame] = protein if as_array else protein.tobytes().decode()
+
+    return results
+
+
+# --------------------------------------------------
+def translate_frames(sequence: str, frames: Iterable[int] = FRAMES, as_array: bool = False) -> Dict[int, Union[str, np.ndarray]]:
+    """ Translate one sequence in the given frames """
+
+    return translate_batch([sequence], frames, as_array)[0]
+
+
+# --------------------------------------------------
+def test_translate_frames() -> None:
+    """ Test translate_frames and translate_batch """
+
+    frames = translate_frames('AUGGCCAUGGCGCCCAGAACUGAGAUCAAUAGUACCCGUAUUAACGGGUGA')
+
+    assert frames[1] == 'MAMAPRTEINSTRING*'
+    assert frames[2] == 'WPWRPELRSIVPVLTG'
+    assert frames[-1] == 'SPVNTGTIDLSSGRHGH'
+    assert frames[-2] == 'HPLIRVLLISVLGAMA'
+    assert translate_frames('atgNNNtaa', [1]) == {1: 'MX*'}
+    assert translate_frames('AC') == {1: '', 2: '', 3: '', -1: '', -2: '', -3: ''}
+    assert translate_frames('ATGTAA', [1], as_array=True)[1].tobytes() == b'M*'
+
+    batch = translate_batch(['ATGAAA', 'TTTCAT', ''], frames=[1, -1])
+    assert batch == [{1: 'MK', -1: 'FH'}, {1: 'FH', -1: 'MK'}, {1: '', -1: ''}]
+    assert translate_batch([]) == []
+
+
+# --------------------------------------------------
+def test_iter_frame_blocks() -> None:
+    """ Test iter_frame_blocks and translate_codons """
+
+    seq = 'AUGGCCAUGGCGCCCAGAACUGAGAUCAAUAGUACCCGUAUUAACGGGUGA'
+    frames = translate_frames(seq)
+
+    for frame in FRAMES:
+        blocks = list(iter_frame_blocks(seq, frame, block_codons=4))
+        assert [first for first, _ in blocks] == list(range(0, len(frames[frame]), 4))
+        assert b''.join(block.tobytes() for _, block in blocks).decode() == frames[frame]
+        assert translate_codons(seq, frame, 2, 5).tobytes().decode() == frames[frame][2:5]
+
+    assert list(iter_frame_blocks('AC', -1)) == []